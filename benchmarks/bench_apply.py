@@ -0,0 +1,60 @@
+"""
+Benchmark DaftBot's apply flow against a local HTML fixture.
+
+Usage:
+    python benchmarks/bench_apply.py --runs 10
+    python benchmarks/bench_apply.py --runs 10 --applied --visible
+
+Serves benchmarks/fixtures on localhost, applies to the fixture listing
+with a real Chrome and reports time per application and per step.
+Needs Chrome installed; no Daft.ie account or network access is used.
+"""
+
+import argparse
+import sys
+from time import perf_counter
+from types import SimpleNamespace
+
+# harness puts the repository root on sys.path
+from harness import bench_config, serve_fixtures, summarize
+
+from daft_bot.selenium_bot import DaftBot
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--applied", action="store_true", help="already-applied page")
+    parser.add_argument("--cached", action="store_true", help="skip filling the form")
+    parser.add_argument("--visible", action="store_true")
+    args = parser.parse_args()
+
+    server = serve_fixtures()
+    url = f"http://127.0.0.1:{server.server_port}/listing.html"
+    listing = SimpleNamespace(daft_link=url + ("?applied" if args.applied else ""))
+
+    bot = DaftBot(bench_config(), email_notifier=None, headless=not args.visible)
+    bot._start_driver()
+
+    totals: list[float] = []
+    steps: dict[str, list[float]] = {}
+    try:
+        for _ in range(args.runs):
+            start = perf_counter()
+            ok = bot._apply_to_listing(listing, use_cached_values=args.cached)
+            totals.append(perf_counter() - start)
+            if not ok:
+                print("Application failed, see screenshots/", file=sys.stderr)
+            for step, elapsed in bot.step_timings.items():
+                steps.setdefault(step, []).append(elapsed)
+    finally:
+        bot._stop_driver()
+        server.shutdown()
+
+    print(summarize("application", totals))
+    for step, samples in steps.items():
+        print(summarize(step, samples))
+
+
+if __name__ == "__main__":
+    main()
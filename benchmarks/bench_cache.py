@@ -0,0 +1,102 @@
+"""
+Benchmark the listing cache at growing sizes.
+
+Usage:
+    python benchmarks/bench_cache.py
+    python benchmarks/bench_cache.py --sizes 1000 100000 1000000 --listings 500
+
+For each size, writes a cache file with that many listings (mostly seen,
+some applied, failed and retry-after) and times load_cache with and
+without the Bloom filter, get_new_listings over a page of half new, half
+cached listings (on the Bloom-loaded cache, so including the full load
+its first cached listing triggers), compaction, and update_cache. Files
+go to a temporary directory that is removed afterwards.
+"""
+
+import argparse
+import random
+import tempfile
+from pathlib import Path
+from time import perf_counter, time
+
+# harness puts the repository root on sys.path
+from harness import fake_listings, summarize
+
+from daft_bot.cache import Status, load_cache, update_cache
+from daft_bot.main import get_new_listings
+
+
+def write_cache_file(path: Path, entries: int) -> None:
+    """Write entries listings with IDs 1..entries in the on-disk format."""
+    now = int(time())
+    with open(path, "w") as f:
+        for ident in range(1, entries + 1):
+            roll = ident % 100
+            if roll < 90:
+                f.write(f"{ident} {Status.SEEN.value}\n")
+            elif roll < 97:
+                f.write(f"{ident} {Status.APPLIED.value}\n")
+            elif roll < 99:
+                f.write(f"{ident} {Status.FAILED.value} {now}\n")
+            else:
+                f.write(f"{ident} {Status.RETRY_AFTER.value} {now} {now + 3600}\n")
+
+
+def bench_size(directory: Path, entries: int, listings: int, runs: int) -> None:
+    cache_file = str(directory / f"cache-{entries}.txt")
+    timings: dict[str, list[float]] = {}
+
+    def timed(name: str, func):
+        start = perf_counter()
+        result = func()
+        timings.setdefault(name, []).append(perf_counter() - start)
+        return result
+
+    for _ in range(runs):
+        write_cache_file(Path(cache_file), entries)
+        Path(cache_file + ".bloom").unlink(missing_ok=True)
+
+        cache = timed("load", lambda: load_cache(cache_file))
+        cache.close()
+
+        # First load builds and saves the filter, the second one uses it
+        load_cache(cache_file, bloom=True).close()
+        cache = timed("load_bloom", lambda: load_cache(cache_file, bloom=True))
+
+        # Half the page is already cached, half is new
+        random.seed(entries)
+        cached = random.sample(range(1, entries + 1), min(entries, listings // 2))
+        page = [listing for i in cached for listing in fake_listings(1, first_id=i)]
+        page += fake_listings(listings - len(page), first_id=entries + 1)
+        random.shuffle(page)
+        timed("get_new", lambda: get_new_listings(page, cache))
+
+        timed("compact", cache.compact)
+        timed("update_cache", lambda: update_cache(cache))
+
+    size = Path(cache_file).stat().st_size / 1024 / 1024
+    print(f"--- {entries:,} entries ({size:.1f}MB)")
+    for name, samples in timings.items():
+        print(summarize(name, samples))
+    rate = listings / (sum(timings["get_new"]) / len(timings["get_new"]))
+    print(f"get_new_listings {rate:,.0f} listings/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000]
+    )
+    parser.add_argument(
+        "--listings", type=int, default=200, help="listings per get_new_listings call"
+    )
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="daft-bot-bench-") as directory:
+        for entries in args.sizes:
+            bench_size(Path(directory), entries, args.listings, args.runs)
+
+
+if __name__ == "__main__":
+    main()
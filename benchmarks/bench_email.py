@@ -0,0 +1,77 @@
+"""
+Benchmark building and sending notification emails against a local sink.
+
+Usage:
+    python benchmarks/bench_email.py
+    python benchmarks/bench_email.py --messages 200 --listings 10
+
+Needs aiosmtpd (pip install aiosmtpd). Times building a message for
+--listings listings, the latency from notify() until the message reaches
+harness.SmtpSink one at a time, and the time to deliver a burst of
+--messages notifications over the notifier's pooled connection. The
+sink has no TLS or login, so those handshakes aren't included.
+"""
+
+import argparse
+import tempfile
+from time import perf_counter
+
+# harness puts the repository root on sys.path
+from harness import (
+    PlainEmailNotifier,
+    SmtpSink,
+    bench_config,
+    fake_listings,
+    summarize,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=100)
+    parser.add_argument("--listings", type=int, default=5, help="listings per email")
+    args = parser.parse_args()
+
+    listings = fake_listings(args.listings)
+    sink = SmtpSink()
+    with tempfile.TemporaryDirectory(prefix="daft-bot-bench-") as directory:
+        config = bench_config(smtp_port=sink.port, outbox_dir=directory).email
+        notifier = PlainEmailNotifier(config)
+        try:
+            build = []
+            for _ in range(args.messages):
+                start = perf_counter()
+                notifier._build_listings_message(listings).as_string()
+                build.append(perf_counter() - start)
+
+            # One at a time: notify() until the sink has the message
+            send = []
+            for count in range(1, args.messages + 1):
+                start = perf_counter()
+                notifier.notify(listings)
+                if not sink.wait_for(count):
+                    raise SystemExit("Timed out waiting for the SMTP sink")
+                send.append(sink.arrivals[-1] - start)
+
+            # Burst: notify() returns straight away, delivery runs behind
+            start = perf_counter()
+            for _ in range(args.messages):
+                notifier.notify(listings)
+            queued = perf_counter() - start
+            if not sink.wait_for(2 * args.messages):
+                raise SystemExit("Timed out waiting for the SMTP sink")
+            burst = sink.arrivals[-1] - start
+        finally:
+            notifier.close()
+            sink.close()
+
+    print(summarize("build", build))
+    print(summarize("notify->sink", send))
+    print(
+        f"burst of {args.messages}: queued in {queued:.3f}s, "
+        f"delivered in {burst:.3f}s ({args.messages / burst:,.0f} emails/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark searching and matching against a local stand-in for Daft's API.
+
+Usage:
+    python benchmarks/bench_search.py
+    python benchmarks/bench_search.py --listings 2000 --profiles 3 --latency 0.2
+
+Serves --listings canned results through harness.DaftStub (with --latency
+seconds added per page) and times stream_profiles for --profiles profiles
+sharing one query: time to the first page, the whole search, and pages
+per second. get_new_listings then runs on every page against an empty
+cache, as process_stream does.
+"""
+
+import argparse
+import dataclasses
+import tempfile
+from time import perf_counter
+
+# harness puts the repository root on sys.path
+from harness import DaftStub, bench_config, fake_result, summarize
+
+from daft_bot.cache import load_cache
+from daft_bot.main import get_new_listings
+from daft_bot.search import stream_profiles
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--listings", type=int, default=1000)
+    parser.add_argument("--profiles", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per page")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    stub = DaftStub(
+        [fake_result(i) for i in range(1, args.listings + 1)], latency=args.latency
+    )
+    timings: dict[str, list[float]] = {}
+    try:
+        with tempfile.TemporaryDirectory(prefix="daft-bot-bench-") as directory:
+            for run in range(args.runs):
+                searches = [
+                    dataclasses.replace(
+                        bench_config(f"{directory}/{run}-{i}.txt").daft_search,
+                        max_beds=3,
+                        max_price=5000,
+                        endpoint=stub.endpoint,
+                    )
+                    for i in range(args.profiles)
+                ]
+                caches = [load_cache(search.cache_file) for search in searches]
+
+                start = perf_counter()
+                first = None
+                found = 0
+                for index, page in stream_profiles(searches, caches):
+                    first = first or perf_counter() - start
+                    found += len(get_new_listings(page, caches[index]))
+                timings.setdefault("first_page", []).append(first)
+                timings.setdefault("search", []).append(perf_counter() - start)
+                for cache in caches:
+                    cache.close()
+    finally:
+        stub.close()
+
+    pages = stub.requests / args.runs
+    print(f"{args.listings} listings, {pages:.0f} pages, {found} new per run")
+    for name, samples in timings.items():
+        print(summarize(name, samples))
+    print(f"{pages / (sum(timings['search']) / args.runs):,.1f} pages/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark how long the bot's entry points take to import.
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 10 --budget 400
+
+Imports each entry point in a fresh interpreter with -X importtime and
+reports the median total and the slowest direct imports of the last
+run. With --budget (milliseconds), exits non-zero if the search-only
+entry point (daft_bot.notify) takes longer, so a heavy import creeping
+back onto that path fails CI.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+MODULES = ["daft_bot.notify", "daft_bot.main", "daft_bot.workers"]
+
+
+def import_times(module: str) -> tuple[float, dict[str, float]]:
+    """Total ms to import module fresh, and ms of each of its direct imports."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    children: dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package", nested
+        # imports indented two spaces per level and listed before their parent
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        ms = int(cumulative) / 1000
+        if depth == 1:
+            children[name.strip()] = ms
+        elif depth == 0:
+            if name.strip() == module:
+                return ms, children
+            children = {}
+    raise RuntimeError(f"{module} not in -X importtime output")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=0, help="ms, for notify")
+    args = parser.parse_args()
+
+    medians = {}
+    for module in MODULES:
+        totals = []
+        for _ in range(args.runs):
+            total, children = import_times(module)
+            totals.append(total)
+        medians[module] = statistics.median(totals)
+        print(f"{module:<18} {medians[module]:7.1f}ms (median of {args.runs})")
+        slowest = sorted(children.items(), key=lambda item: item[1], reverse=True)
+        for name, ms in slowest[: args.top]:
+            print(f"    {name:<34} {ms:7.1f}ms")
+
+    if args.budget and medians["daft_bot.notify"] > args.budget:
+        print(f"daft_bot.notify is over the {args.budget:.0f}ms budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+Local stand-ins for daft.ie, the mail server and listing pages.
+
+Used by the benchmarks so no code path needs the network:
+
+- DaftStub: serves canned search results in the shape of Daft's
+  listings API; point DaftSearchConfig.endpoint at stub.endpoint.
+- SmtpSink: an aiosmtpd server that accepts and counts every message.
+- serve_fixtures: serves benchmarks/fixtures (listing pages using the
+  selectors in DaftBot.SELECTORS).
+"""
+
+import functools
+import json
+import logging
+import smtplib
+import socket
+import statistics
+import sys
+import threading
+from http.server import (
+    BaseHTTPRequestHandler,
+    SimpleHTTPRequestHandler,
+    ThreadingHTTPServer,
+)
+from pathlib import Path
+from time import perf_counter, sleep, time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from daft_bot.config import (  # noqa: E402
+    AppConfig,
+    DaftAccountConfig,
+    DaftSearchConfig,
+    EmailConfig,
+)
+from daft_bot.daft_api import PAGE_SIZE, Listing  # noqa: E402
+from daft_bot.email_notification import EmailNotifier  # noqa: E402
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+# Keep "Cache file not found" and friends out of the results
+logging.getLogger("daft_bot").setLevel(logging.ERROR)
+
+
+def fake_result(ident: int, published_ms: int | None = None) -> dict:
+    """One search result shaped like Daft's API, enough for every code path."""
+    published_ms = published_ms or int(time() * 1000) - ident * 60_000
+    return {
+        "listing": {
+            "id": ident,
+            "title": f"Apartment {ident}, Fixture Street, Dublin 4",
+            "seoFriendlyPath": f"/for-rent/apartment-{ident}-dublin-4/{ident}",
+            "price": f"€{1500 + ident % 1500} per month",
+            "numBedrooms": f"{1 + ident % 3} Bed",
+            "numBathrooms": f"{1 + ident % 2} Bath",
+            "propertyType": "Apartment",
+            "publishDate": published_ms,
+            "ber": {"rating": "B2"},
+            "point": {"coordinates": [-6.2297, 53.3285]},
+            "seller": {"name": "Fixture Lettings"},
+            "media": {
+                "images": [
+                    {"size720x480": f"http://127.0.0.1/images/{ident}-{n}.jpg"}
+                    for n in range(3)
+                ]
+            },
+        }
+    }
+
+
+def fake_listings(count: int, first_id: int = 1) -> list[Listing]:
+    return [Listing(fake_result(i)) for i in range(first_id, first_id + count)]
+
+
+class _QuietMixin:
+    def log_message(self, *args) -> None:
+        pass
+
+
+class QuietHandler(_QuietMixin, SimpleHTTPRequestHandler):
+    pass
+
+
+def _serve(handler) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def serve_fixtures() -> ThreadingHTTPServer:
+    """Serve the fixtures directory on a free localhost port."""
+    return _serve(functools.partial(QuietHandler, directory=str(FIXTURES)))
+
+
+class DaftStub:
+    """
+    Canned listings API: POST the usual search payload, get one page back.
+
+    Results are newest first, like a PUBLISH_DATE_DESC search; latency
+    is added to every response to stand in for the round-trip to Daft.
+    """
+
+    def __init__(self, results: list[dict], latency: float = 0.0) -> None:
+        self.results = results
+        self.latency = latency
+        self.requests = 0
+        self._server = _serve(self._handler())
+
+    @property
+    def endpoint(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}/api/v2/ads/listings"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(_QuietMixin, BaseHTTPRequestHandler):
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                start = int(payload.get("paging", {}).get("from", 0))
+                body = json.dumps(
+                    {
+                        "listings": stub.results[start : start + PAGE_SIZE],
+                        "paging": {"totalResults": len(stub.results)},
+                    }
+                ).encode()
+                stub.requests += 1
+                if stub.latency:
+                    sleep(stub.latency)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class SmtpSink:
+    """aiosmtpd server on a free port that records when each message arrives."""
+
+    def __init__(self) -> None:
+        # Only needed by the email benchmark, so not a project dependency
+        try:
+            from aiosmtpd.controller import Controller
+        except ImportError:
+            raise SystemExit("The SMTP sink needs aiosmtpd: pip install aiosmtpd")
+
+        self.arrivals: list[float] = []
+        self._received = threading.Condition()
+        # Controller checks it is up by connecting, so it can't take port 0
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            self.port = probe.getsockname()[1]
+        self._controller = Controller(self, hostname="127.0.0.1", port=self.port)
+        self._controller.start()
+
+    async def handle_DATA(self, server, session, envelope) -> str:
+        with self._received:
+            self.arrivals.append(perf_counter())
+            self._received.notify_all()
+        return "250 Message accepted for delivery"
+
+    def wait_for(self, count: int, timeout: float = 30) -> bool:
+        """Block until count messages have arrived in total."""
+        with self._received:
+            return self._received.wait_for(
+                lambda: len(self.arrivals) >= count, timeout
+            )
+
+    def close(self) -> None:
+        self._controller.stop()
+
+
+class PlainEmailNotifier(EmailNotifier):
+    """EmailNotifier over plain SMTP: the sink has no STARTTLS or AUTH."""
+
+    def _create_smtp_connection(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(
+            self.config.server, self.config.port, timeout=self.SMTP_TIMEOUT
+        )
+        server.ehlo()
+        return server
+
+
+def bench_config(
+    cache_file: str = "/dev/null", smtp_port: int = 25, outbox_dir: str = ".outbox"
+) -> AppConfig:
+    """Placeholder config: the stand-ins never check credentials."""
+    return AppConfig(
+        email=EmailConfig(
+            "127.0.0.1",
+            smtp_port,
+            "",
+            "",
+            "bench@localhost",
+            ["bench@localhost"],
+            outbox_dir=outbox_dir,
+        ),
+        daft_search=DaftSearchConfig(1, 1, 1, 0, cache_file),
+        daft_account=DaftAccountConfig(
+            email="bench@localhost",
+            password="",
+            first_name="Bench",
+            last_name="Mark",
+            phone_number="000",
+            message_text="Hello from the benchmark",
+        ),
+    )
+
+
+def summarize(name: str, samples: list[float]) -> str:
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, round(0.95 * (len(samples) - 1)))]
+    return (
+        f"{name:<14} mean {statistics.mean(samples):6.3f}s  "
+        f"p50 {statistics.median(samples):6.3f}s  p95 {p95:6.3f}s"
+    )
@@ -1,59 +1,537 @@
-import sys
+import hashlib
+import json
+import math
+import os
+import re
+import struct
+import threading
+from dataclasses import asdict, dataclass, field
+from enum import Enum
 from pathlib import Path
-from daftlistings import Listing
+from time import time
+from .daft_api import Listing
 from .logger import get_logger
 
 log = get_logger(__name__)
 
+# Daft links end in the numeric listing ID: .../for-rent/<slug>/4679001
+_LISTING_ID = re.compile(r"(\d+)/?$")
 
-def load_cache(cache_file: str) -> dict[str, str]:
-    """Load cache from file. Returns empty dict if file doesn't exist."""
-    cache_path = Path(cache_file)
-    log.info("Loading cache")
 
-    cache: dict[str, str] = {}
-    try:
-        with open(cache_path, "r") as f:
-            for line in f:
-                stripped = line.strip()
-                if stripped:  # Skip empty lines
-                    cache[stripped] = ""
-        log.debug(f"Loaded {len(cache)} entries from cache")
-    except FileNotFoundError:
-        log.warning("Cache file not found. Starting fresh.")
-    except PermissionError as e:
-        log.error(f"Permission denied reading cache file: {e}")
+class Status(str, Enum):
+    """What happened to a listing the bot has come across."""
 
-    return cache
+    SEEN = "seen"
+    APPLIED = "applied"
+    FAILED = "failed"
+    RETRY_AFTER = "retry-after"
 
 
-def update_cache(cache: dict[str, str], cache_file: str) -> None:
-    """Write cache to file."""
-    cache_path = Path(cache_file)
-    try:
-        with open(cache_path, "w") as f:
-            for key in cache:
-                f.write(f"{key}\n")
-        log.info(f"Cache updated ({len(cache)} entries)")
-    except (IOError, OSError) as e:
-        log.error(f"Unable to write cache file: {e}")
-        sys.exit(1)
+@dataclass(frozen=True)
+class CacheEntry:
+    """
+    Latest recorded state of one listing.
+
+    Timestamps are only kept in memory for failed/retry-after entries;
+    seen and applied listings report updated=0.
+    """
+
+    status: Status
+    updated: int = 0
+    retry_after: int | None = None
+
+
+def listing_id(key: str | int) -> int:
+    """Normalize a Daft link or ID to the numeric listing ID."""
+    if isinstance(key, int):
+        return key
+    match = _LISTING_ID.search(key.strip())
+    if not match:
+        raise ValueError(f"No listing ID in {key!r}")
+    return int(match.group(1))
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over listing IDs.
+
+    Saved next to the cache file together with how many bytes of the
+    cache file it covers, so lines appended since can be caught up, and
+    a trailer of cache lines (the failed and retry-after entries).
+    """
+
+    MAGIC = b"DBF2"
+    # magic, bit count, hash count, covered bytes, cache lines, cache entries
+    _HEADER = struct.Struct("<4sQBQQQ")
+
+    def __init__(self, capacity: int, error_rate: float = 0.01) -> None:
+        capacity = max(capacity, 1)
+        self.bits = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self._array = bytearray((self.bits + 7) // 8)
+
+    def _positions(self, ident: int):
+        digest = hashlib.blake2b(
+            ident.to_bytes(8, "little", signed=True), digest_size=16
+        ).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.bits
+
+    def add(self, ident: int) -> None:
+        for pos in self._positions(ident):
+            self._array[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, ident: int) -> bool:
+        return all(
+            self._array[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(ident)
+        )
+
+    def save(
+        self,
+        path: Path,
+        covered: int,
+        lines: int,
+        entries: int,
+        trailer: bytes = b"",
+    ) -> None:
+        """Atomically write the filter and what it covers to disk."""
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(
+                self._HEADER.pack(
+                    self.MAGIC, self.bits, self.hashes, covered, lines, entries
+                )
+            )
+            f.write(self._array)
+            f.write(trailer)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> tuple["BloomFilter", int, int, int, bytes] | None:
+        """
+        Read a saved filter.
+
+        Returns (filter, covered, lines, entries, trailer) or None.
+        """
+        try:
+            with open(path, "rb") as f:
+                header = cls._HEADER.unpack(f.read(cls._HEADER.size))
+                magic, bits, hashes, covered, lines, entries = header
+                if magic != cls.MAGIC:
+                    return None
+                array = bytearray(f.read((bits + 7) // 8))
+                trailer = f.read()
+        except (OSError, struct.error):
+            return None
+        if len(array) != (bits + 7) // 8:
+            return None
+
+        bloom = cls.__new__(cls)
+        bloom.bits, bloom.hashes, bloom._array = bits, hashes, array
+        return bloom, covered, lines, entries, trailer
+
+
+class ListingCache:
+    """
+    Append-only store of listings keyed by Daft listing ID.
+
+    Every status change is appended to the cache file as one
+    "<id> <status> <timestamp> [<retry_after>]" line and fsynced, so the
+    file is never rewritten during a run. When superseded lines outnumber
+    live entries the file is compacted into a temp file and atomically
+    swapped in. Legacy files with one daft_link per line load as "seen".
+
+    In memory, seen and applied listings are plain int sets, so the same
+    listing under http/https or a changed slug is stored once. With
+    bloom=True a Bloom filter saved beside the cache file answers "never
+    seen" without reading the cache; the file is only replayed the first
+    time the filter can't rule a listing out. Failed and retry-after
+    entries are saved with the filter, so due_for_retry doesn't replay it
+    either.
+
+    All public methods are safe to call from several threads.
+    """
+
+    COMPACT_MIN_LINES = 1000
+
+    def __init__(self, cache_file: str, bloom: bool = False) -> None:
+        self.path = Path(cache_file)
+        self.bloom_path = self.path.with_name(self.path.name + ".bloom")
+        self._seen: set[int] = set()
+        self._applied: set[int] = set()
+        self._pending: dict[int, CacheEntry] = {}  # failed and retry-after
+        self._lines = 0
+        self._legacy_lines = 0
+        self._file = None
+        self._lock = threading.RLock()  # Shared by parallel application workers
+
+        self._use_bloom = bloom
+        self._bloom: BloomFilter | None = None
+        self._bloom_entries = 0
+        self._loaded = False
+
+    def __contains__(self, key: str | int) -> bool:
+        """True if the listing needs no further action right now."""
+        with self._lock:
+            ident = listing_id(key)
+            if not self._loaded:
+                if self._bloom is not None and ident not in self._bloom:
+                    return False
+                self._load_all()
+
+            if ident in self._seen or ident in self._applied:
+                return True
+            entry = self._pending.get(ident)
+            if entry is None or entry.status == Status.FAILED:
+                return False
+            return time() < (entry.retry_after or 0)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            return len(self._seen) + len(self._applied) + len(self._pending)
+
+    def get(self, key: str | int) -> CacheEntry | None:
+        """Return the latest entry for a listing, if any."""
+        with self._lock:
+            self._ensure_loaded()
+            ident = listing_id(key)
+            if ident in self._seen:
+                return CacheEntry(Status.SEEN)
+            if ident in self._applied:
+                return CacheEntry(Status.APPLIED)
+            return self._pending.get(ident)
+
+    def due_for_retry(self, max_age: float) -> set[int]:
+        """
+        IDs of failed listings, and retry-after ones whose wait is over.
+
+        Only entries updated within the last max_age seconds are included.
+        """
+        with self._lock:
+            # Pending entries are known without replaying the file
+            now = time()
+            return {
+                ident
+                for ident, entry in self._pending.items()
+                if entry.updated >= now - max_age
+                and (entry.status == Status.FAILED or now >= (entry.retry_after or 0))
+            }
+
+    def load(self) -> "ListingCache":
+        """Load the Bloom filter if enabled and usable, else replay the cache file."""
+        with self._lock:
+            if self._use_bloom and self._load_bloom():
+                log.debug("Loaded cache Bloom filter")
+                return self
+            self._load_all()
+            return self
+
+    def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            self._load_all()
+
+    def _load_all(self) -> None:
+        """Replay the whole cache file into memory."""
+        self._seen, self._applied, self._pending = set(), set(), {}
+        self._lines = self._legacy_lines = 0
+        try:
+            with open(self.path, "r") as f:
+                for line in f:
+                    self._load_line(line)
+        except FileNotFoundError:
+            log.warning("Cache file not found. Starting fresh.")
+        except PermissionError as e:
+            log.error("Permission denied reading cache file: %s", e)
+        self._loaded = True
+        log.debug("Loaded %s entries from cache", len(self))
+
+        if self._legacy_lines:
+            log.info("Migrating %s legacy cache line(s)", self._legacy_lines)
+            self.compact()
+        elif self._use_bloom and self._bloom is None:
+            self._rebuild_bloom()
 
+    def _load_line(self, line: str) -> None:
+        fields = line.split()
+        if not fields:  # Skip empty lines
+            return
+        self._lines += 1
 
-def save_images(listings: list[Listing], images_file: str = "images.txt") -> None:
-    """Append listing images to file."""
-    if not listings:
+        try:
+            if fields[0].startswith("http"):
+                self._set(listing_id(fields[0]), Status.SEEN)
+                self._legacy_lines += 1
+                return
+            self._set(*self._parse(fields))
+        except (IndexError, ValueError):
+            # A torn write from a crash only ever affects the last line
+            log.warning("Skipping unreadable cache line: %r", line.strip())
+
+    @staticmethod
+    def _parse(fields: list) -> tuple[int, Status, int, int | None]:
+        """(id, status, updated, retry_after) of a split cache line."""
+        ident, status = int(fields[0]), Status(fields[1])
+        if status in (Status.SEEN, Status.APPLIED):
+            return ident, status, 0, None
+        retry_after = int(fields[3]) if len(fields) > 3 else None
+        return ident, status, int(fields[2]), retry_after
+
+    def _set(
+        self,
+        ident: int,
+        status: Status,
+        updated: int = 0,
+        retry_after: int | None = None,
+    ) -> None:
+        self._seen.discard(ident)
+        self._applied.discard(ident)
+        self._pending.pop(ident, None)
+        if status == Status.SEEN:
+            self._seen.add(ident)
+        elif status == Status.APPLIED:
+            self._applied.add(ident)
+        else:
+            self._pending[ident] = CacheEntry(status, updated, retry_after)
+
+    def _ids(self):
+        yield from self._seen
+        yield from self._applied
+        yield from self._pending
+
+    def _load_bloom(self) -> bool:
+        """Load the saved filter and catch up on lines appended since."""
+        saved = BloomFilter.load(self.bloom_path)
+        if saved is None:
+            return False
+        bloom, covered, lines, entries, trailer = saved
+
+        pending: dict[int, CacheEntry] = {}
+
+        def track(fields: list) -> int:
+            ident, status, updated, retry_after = self._parse(fields)
+            pending.pop(ident, None)
+            if status not in (Status.SEEN, Status.APPLIED):
+                pending[ident] = CacheEntry(status, updated, retry_after)
+            return ident
+
+        try:
+            for raw in trailer.splitlines():
+                track(raw.decode().split())
+            with open(self.path, "rb") as f:
+                f.seek(0, os.SEEK_END)
+                if f.tell() < covered:
+                    return False  # Cache file was replaced behind our back
+                f.seek(covered)
+                for raw in f:
+                    fields = raw.decode().split()
+                    if fields:
+                        bloom.add(track(fields))
+                        lines += 1
+        except FileNotFoundError:
+            return False
+        except (IndexError, ValueError):
+            return False  # Legacy or corrupt tail, replay the file instead
+
+        self._bloom, self._lines, self._bloom_entries = bloom, lines, entries
+        self._pending = pending
+        return True
+
+    def _rebuild_bloom(self) -> None:
+        count = len(self)
+        self._bloom = BloomFilter(max(2 * count, 10_000))
+        for ident in self._ids():
+            self._bloom.add(ident)
+
+    def _save_bloom(self) -> None:
+        try:
+            self._bloom.save(
+                self.bloom_path,
+                covered=self.path.stat().st_size,
+                lines=self._lines,
+                entries=len(self) if self._loaded else self._bloom_entries,
+                trailer="".join(
+                    self._format(ident, e.status, e.updated, e.retry_after)
+                    for ident, e in self._pending.items()
+                ).encode(),
+            )
+        except OSError as e:
+            log.warning("Unable to save cache Bloom filter: %s", e)
+
+    def mark(
+        self,
+        key: str | int,
+        status: Status,
+        retry_after: float | None = None,
+    ) -> None:
+        """Record a new status for a listing and append it to disk."""
+        with self._lock:
+            ident = listing_id(key)
+            updated = int(time())
+            retry_after = int(retry_after) if retry_after else None
+            # Before the file is replayed only the pending entries are complete
+            self._set(ident, status, updated, retry_after)
+            if self._bloom is not None:
+                self._bloom.add(ident)
+                self._bloom_entries += 1
+            self._append(self._format(ident, status, updated, retry_after))
+
+    @staticmethod
+    def _format(
+        ident: int,
+        status: Status,
+        updated: int | None = None,
+        retry_after: int | None = None,
+    ) -> str:
+        line = f"{ident} {status.value}"
+        if updated is not None:
+            line += f" {updated}"
+        if retry_after is not None:
+            line += f" {retry_after}"
+        return line + "\n"
+
+    def _append(self, line: str) -> None:
+        try:
+            if self._file is None:
+                self._file = open(self.path, "a")
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._lines += 1
+        except (IOError, OSError) as e:
+            log.error("Unable to append to cache file: %s", e)
+
+    def needs_compaction(self) -> bool:
+        """True once superseded lines outnumber live entries."""
+        entries = len(self) if self._loaded else self._bloom_entries
+        return self._lines > max(self.COMPACT_MIN_LINES, 2 * entries)
+
+    def compact(self) -> None:
+        """Rewrite the file with one line per listing and atomically replace it."""
+        with self._lock:
+            self._ensure_loaded()
+            self._close_file()
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            try:
+                with open(tmp_path, "w") as f:
+                    for ident in self._seen:
+                        f.write(self._format(ident, Status.SEEN))
+                    for ident in self._applied:
+                        f.write(self._format(ident, Status.APPLIED))
+                    for ident, e in self._pending.items():
+                        f.write(self._format(ident, e.status, e.updated, e.retry_after))
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+                _fsync_dir(self.path.parent)
+                self._lines = len(self)
+                self._legacy_lines = 0
+                log.info("Cache compacted (%s entries)", len(self))
+            except (IOError, OSError) as e:
+                log.error("Unable to compact cache file: %s", e)
+                tmp_path.unlink(missing_ok=True)
+
+            if self._use_bloom:
+                self._rebuild_bloom()
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self) -> None:
+        """Close the append handle and save the Bloom filter if enabled."""
+        with self._lock:
+            self._close_file()
+            if self._bloom is not None and self.path.exists():
+                self._save_bloom()
+
+
+def _fsync_dir(directory: Path) -> None:
+    """Persist a rename by syncing its directory (no-op where unsupported)."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
         return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def load_cache(cache_file: str, bloom: bool = False) -> ListingCache:
+    """Load cache from file. Returns an empty cache if file doesn't exist."""
+    log.info("Loading cache")
+    return ListingCache(cache_file, bloom=bloom).load()
+
+
+def update_cache(cache: ListingCache) -> None:
+    """Finish a run: compact the cache file if it has grown, then close it."""
+    if cache.needs_compaction():
+        cache.compact()
+    cache.close()
+    log.info("Cache updated")
+
+
+@dataclass
+class HighWaterMark:
+    """
+    Newest listing a profile's search has returned so far.
+
+    Also counts, per listing due for a retry, the searches in a row that
+    didn't return it, so delisted ones stop being searched for.
+    """
 
+    listing_id: int = 0
+    publish_date: int = 0  # milliseconds since epoch, as Daft reports it
+    missed: dict[str, int] = field(default_factory=dict)  # JSON keys are str
+
+    def advance(self, listing: Listing) -> None:
+        """Move the mark forward if the listing is newer."""
+        publish_date = listing.as_dict().get("publishDate") or 0
+        if publish_date > self.publish_date:
+            self.listing_id = listing_id(listing.daft_link)
+            self.publish_date = publish_date
+
+    def retries(self, due: set[int], max_missed: int) -> set[int]:
+        """The listings in due that are still worth searching for."""
+        return {i for i in due if self.missed.get(str(i), 0) < max_missed}
+
+    def record_retries(self, due: set[int], found: set[int]) -> None:
+        """Count another miss for each listing in due that wasn't found."""
+        self.missed = {
+            str(i): self.missed.get(str(i), 0) + 1 for i in sorted(due - found)
+        }
+
+
+def _high_water_mark_path(cache_file: str) -> Path:
+    path = Path(cache_file)
+    return path.with_name(path.name + ".hwm")
+
+
+def load_high_water_mark(cache_file: str) -> HighWaterMark:
+    """Load the high-water mark stored next to a cache file."""
     try:
-        with open(images_file, "a") as f:
-            for listing in listings:
-                f.write(f"\n{'=' * 50}\n{listing.title}\n{listing.daft_link}\n\n")
+        with open(_high_water_mark_path(cache_file), "r") as f:
+            return HighWaterMark(**json.load(f))
+    except FileNotFoundError:
+        return HighWaterMark()
+    except (OSError, ValueError, TypeError) as e:
+        log.warning("Ignoring unreadable high-water mark: %s", e)
+        return HighWaterMark()
 
-                for img in listing.images:
-                    if "size720x480" in img:
-                        f.write(f"{img['size720x480']}\n")
 
-        log.info(f"Images saved for {len(listings)} listing(s)")
+def save_high_water_mark(cache_file: str, mark: HighWaterMark) -> None:
+    """Atomically store the high-water mark next to a cache file."""
+    path = _high_water_mark_path(cache_file)
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(asdict(mark), f)
+        os.replace(tmp_path, path)
     except (IOError, OSError) as e:
-        log.error(f"Unable to save images: {e}")
+        log.error("Unable to save high-water mark: %s", e)
@@ -1,15 +1,40 @@
-from dataclasses import dataclass
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from pathlib import Path
 import os
 
+from .daft_api import DISTANCES, location_id
 
-def _get_env_var(name: str) -> str:
-    """Get environment variable or raise an error if not set."""
-    value = os.getenv(name)
+# daftlistings Location member names searched unless search_locations is set
+DEFAULT_LOCATIONS = (
+    "RANELAGH_DUBLIN",
+    "BALLSBRIDGE_DUBLIN",
+    "DUBLIN_4_DUBLIN",
+    "DUBLIN_2_DUBLIN",
+    "DONNYBROOK_DUBLIN",
+    "RATHMINES_DUBLIN",
+    "GRAND_CANAL_DOCK_DUBLIN",
+)
+
+
+def _get_env_var(
+    name: str,
+    env: Mapping[str, str] | None = None,
+    default: str | None = None,
+) -> str:
+    """Get environment variable, falling back to default or raising if not set."""
+    value = (os.environ if env is None else env).get(name, default)
     if value is None:
         raise ValueError(f"Environment variable '{name}' is not set")
     return value
 
 
+def _get_env_flag(name: str, env: Mapping[str, str] | None, default: bool) -> bool:
+    """Get an optional true/false environment variable."""
+    value = _get_env_var(name, env, str(default))
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
 @dataclass(frozen=True)
 class EmailConfig:
     """Email server configuration."""
@@ -21,6 +46,22 @@ class EmailConfig:
     sender: str
     recipients: list[str]
     subject: str = "New Daft Listings"
+    outbox_dir: str = ".outbox"  # undelivered messages, one directory per profile
+
+
+@dataclass(frozen=True)
+class FilterConfig:
+    """Local rules applied to search results; empty/zero values are off."""
+
+    exclude_title: str = ""  # regex, case-insensitive
+    require_title: str = ""  # regex, case-insensitive
+    exclude_property_types: tuple[str, ...] = ()  # e.g. ("Studio",)
+    worst_ber: str = ""  # e.g. "C3"; exempt/unknown ratings pass
+    min_price: int = 0  # monthly
+    min_floor_area: int = 0  # m2
+    max_floor_area: int = 0  # m2
+    near: tuple[float, float] | None = None  # (latitude, longitude)
+    radius_km: float = 0.0
 
 
 @dataclass(frozen=True)
@@ -32,6 +73,16 @@ class DaftSearchConfig:
     min_baths: int
     max_price: int
     cache_file: str
+    locations: tuple[str, ...] = DEFAULT_LOCATIONS
+    distance: str = "KM1"  # daftlistings Distance member name
+    cache_bloom: bool = False
+    stop_after_seen: int = 0  # 0 disables incremental search
+    endpoint: str = "https://gateway.daft.ie/api/v2/ads/listings"
+    response_cache_dir: str = ""  # empty disables the search response cache
+    response_cache_ttl: int = 3600  # seconds
+    response_cache_size: int = 256  # entries
+    images_db: str = "images.db"  # image manifest, may be shared by profiles
+    filters: FilterConfig = field(default_factory=FilterConfig)
 
 
 @dataclass(frozen=True)
@@ -44,6 +95,47 @@ class DaftAccountConfig:
     last_name: str
     phone_number: str
     message_text: str
+    session_file: str = ".daft_session.json"  # empty disables session reuse
+
+
+@dataclass(frozen=True)
+class ApplyConfig:
+    """How automated applications are sent."""
+
+    workers: int = 1  # parallel logged-in browsers
+    listing_interval: float = 2.0  # seconds between listing page loads
+    # Unconfirmed API, so sending enquiries over HTTP is opt-in; empty disables
+    enquiry_endpoint: str = ""
+    max_per_run: int = 0  # 0 = no cap; the rest are retried next run
+    ledger_file: str = "ledger.db"  # shared by profiles; empty disables
+    # Apply-order score (see priority.py); higher goes first
+    weight_freshness: float = 1.0
+    freshness_half_life: float = 24.0  # hours
+    weight_price: float = 1.0
+    weight_location: float = 1.0
+    preferred_locations: tuple[str, ...] = ()
+    agent_weights: dict[str, float] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class BrowserConfig:
+    """How Chrome is found and launched."""
+
+    chromedriver_path: str = ""  # pinned driver; empty resolves and caches one
+    driver_cache_file: str = ".chromedriver.json"
+    profile_dir: str = ""  # reused Chrome user-data-dir; empty starts fresh
+    block_images: bool = True
+    block_trackers: bool = True
+
+
+@dataclass(frozen=True)
+class ImageConfig:
+    """Optional local cache of listing images."""
+
+    cache_dir: str = ""  # empty disables prefetching
+    cache_size_mb: int = 500
+    size: str = "size720x480"  # which variant to download
+    workers: int = 4
 
 
 @dataclass(frozen=True)
@@ -53,38 +145,195 @@ class AppConfig:
     email: EmailConfig
     daft_search: DaftSearchConfig
     daft_account: DaftAccountConfig
+    apply: ApplyConfig = field(default_factory=ApplyConfig)
+    browser: BrowserConfig = field(default_factory=BrowserConfig)
+    images: ImageConfig = field(default_factory=ImageConfig)
+
+    @property
+    def profile(self) -> str:
+        """Name used for this profile in logs: the cache file's stem."""
+        return Path(self.daft_search.cache_file).stem
+
 
+def _parse_weights(value: str) -> dict[str, float]:
+    """Parse "Name A:1.5,Name B:-1" into {"Name A": 1.5, "Name B": -1.0}."""
+    weights = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        name, sep, weight = item.rpartition(":")
+        if not sep or not name.strip():
+            raise ValueError(f"Expected 'name:weight', got {item.strip()!r}")
+        weights[name.strip()] = float(weight)
+    return weights
 
-def load_config() -> AppConfig:
-    """Load all configuration from environment variables at startup."""
+
+def _load_filters(env: Mapping[str, str] | None) -> FilterConfig:
+    """Read the optional filter_* variables."""
+    near = _get_env_var("filter_near", env, "")
+    point = tuple(float(x) for x in near.split(",")) if near else None
+    if point is not None and len(point) != 2:
+        raise ValueError(f"filter_near must be 'latitude,longitude', got {near!r}")
+    property_types = _get_env_var("filter_exclude_property_types", env, "")
+    return FilterConfig(
+        exclude_title=_get_env_var("filter_exclude_title", env, ""),
+        require_title=_get_env_var("filter_require_title", env, ""),
+        exclude_property_types=tuple(
+            t.strip() for t in property_types.split(",") if t.strip()
+        ),
+        worst_ber=_get_env_var("filter_worst_ber", env, "").strip().upper(),
+        min_price=int(_get_env_var("filter_min_price", env, "0")),
+        min_floor_area=int(_get_env_var("filter_min_floor_area", env, "0")),
+        max_floor_area=int(_get_env_var("filter_max_floor_area", env, "0")),
+        near=point,
+        radius_km=float(_get_env_var("filter_radius_km", env, "0")),
+    )
+
+
+def load_config(env: Mapping[str, str] | None = None) -> AppConfig:
+    """
+    Load all configuration from environment variables at startup.
+
+    Reads from os.environ unless an explicit mapping is given, which lets
+    several profiles be loaded side by side in one process.
+    """
     email = EmailConfig(
-        server=_get_env_var("email_server"),
-        port=int(_get_env_var("email_port")),
-        user=_get_env_var("email_user"),
-        password=_get_env_var("email_password"),
-        sender=_get_env_var("sender_email"),
-        recipients=_get_env_var("recipients").split(","),
+        server=_get_env_var("email_server", env),
+        port=int(_get_env_var("email_port", env)),
+        user=_get_env_var("email_user", env),
+        password=_get_env_var("email_password", env),
+        sender=_get_env_var("sender_email", env),
+        recipients=_get_env_var("recipients", env).split(","),
+        # Kept next to the profile's cache so profiles never share an outbox
+        outbox_dir=_get_env_var(
+            "email_outbox_dir", env, f"{_get_env_var('cache_file', env)}.outbox"
+        ),
     )
 
     daft_search = DaftSearchConfig(
-        min_beds=int(_get_env_var("rent_min_bedroom")),
-        max_beds=int(_get_env_var("rent_max_bedroom")),
-        min_baths=int(_get_env_var("rent_min_bath")),
-        max_price=int(_get_env_var("rent_max_price")),
-        cache_file=_get_env_var("cache_file"),
+        min_beds=int(_get_env_var("rent_min_bedroom", env)),
+        max_beds=int(_get_env_var("rent_max_bedroom", env)),
+        min_baths=int(_get_env_var("rent_min_bath", env)),
+        max_price=int(_get_env_var("rent_max_price", env)),
+        cache_file=_get_env_var("cache_file", env),
+        locations=tuple(
+            l.strip().upper()
+            for l in _get_env_var("search_locations", env, "").split(",")
+            if l.strip()
+        )
+        or DEFAULT_LOCATIONS,
+        distance=_get_env_var("search_distance", env, "KM1").strip().upper(),
+        cache_bloom=_get_env_flag("cache_bloom", env, False),
+        stop_after_seen=int(_get_env_var("search_stop_after_seen", env, "0")),
+        endpoint=_get_env_var("search_endpoint", env, DaftSearchConfig.endpoint),
+        response_cache_dir=_get_env_var("search_cache_dir", env, ""),
+        response_cache_ttl=int(_get_env_var("search_cache_ttl", env, "3600")),
+        response_cache_size=int(_get_env_var("search_cache_size", env, "256")),
+        images_db=_get_env_var("images_db", env, DaftSearchConfig.images_db),
+        filters=_load_filters(env),
     )
 
     daft_account = DaftAccountConfig(
-        email=_get_env_var("daft_email"),
-        password=_get_env_var("daft_password"),
-        first_name=_get_env_var("daft_first_name"),
-        last_name=_get_env_var("daft_last_name"),
-        phone_number=_get_env_var("daft_phone_number"),
-        message_text=_get_env_var("daft_text"),
+        email=_get_env_var("daft_email", env),
+        password=_get_env_var("daft_password", env),
+        first_name=_get_env_var("daft_first_name", env),
+        last_name=_get_env_var("daft_last_name", env),
+        phone_number=_get_env_var("daft_phone_number", env),
+        message_text=_get_env_var("daft_text", env),
+        session_file=_get_env_var(
+            "daft_session_file", env, DaftAccountConfig.session_file
+        ),
+    )
+
+    apply = ApplyConfig(
+        workers=int(_get_env_var("apply_workers", env, "1")),
+        listing_interval=float(_get_env_var("apply_listing_interval", env, "2")),
+        enquiry_endpoint=_get_env_var(
+            "apply_enquiry_endpoint", env, ApplyConfig.enquiry_endpoint
+        ),
+        max_per_run=int(_get_env_var("apply_max_per_run", env, "0")),
+        ledger_file=_get_env_var("ledger_file", env, ApplyConfig.ledger_file),
+        weight_freshness=float(_get_env_var("apply_weight_freshness", env, "1")),
+        freshness_half_life=float(
+            _get_env_var("apply_freshness_half_life", env, "24")
+        ),
+        weight_price=float(_get_env_var("apply_weight_price", env, "1")),
+        weight_location=float(_get_env_var("apply_weight_location", env, "1")),
+        preferred_locations=tuple(
+            l.strip()
+            for l in _get_env_var("apply_preferred_locations", env, "").split(",")
+            if l.strip()
+        ),
+        agent_weights=_parse_weights(_get_env_var("apply_agent_weights", env, "")),
+    )
+
+    browser = BrowserConfig(
+        chromedriver_path=_get_env_var("chromedriver_path", env, ""),
+        driver_cache_file=_get_env_var(
+            "chromedriver_cache_file", env, BrowserConfig.driver_cache_file
+        ),
+        profile_dir=_get_env_var("chrome_profile_dir", env, ""),
+        block_images=_get_env_flag("chrome_block_images", env, True),
+        block_trackers=_get_env_flag("chrome_block_trackers", env, True),
+    )
+
+    images = ImageConfig(
+        cache_dir=_get_env_var("image_cache_dir", env, ""),
+        cache_size_mb=int(_get_env_var("image_cache_size_mb", env, "500")),
+        size=_get_env_var("image_prefetch_size", env, ImageConfig.size),
+        workers=int(_get_env_var("image_prefetch_workers", env, "4")),
     )
 
-    return AppConfig(
+    config = AppConfig(
         email=email,
         daft_search=daft_search,
         daft_account=daft_account,
+        apply=apply,
+        browser=browser,
+        images=images,
     )
+    validate_config(config)
+    return config
+
+
+def validate_config(config: AppConfig) -> None:
+    """
+    Check settings that parse but can't work together.
+
+    Raises ValueError naming every problem at once, so a bad profile is
+    rejected at startup (or on reload) instead of failing mid-search.
+    """
+    search = config.daft_search
+    problems = []
+    if search.min_beds > search.max_beds:
+        problems.append(
+            f"rent_min_bedroom ({search.min_beds}) is above "
+            f"rent_max_bedroom ({search.max_beds})"
+        )
+    if search.max_price <= 0:
+        problems.append(f"rent_max_price must be positive, got {search.max_price}")
+    if search.distance not in DISTANCES:
+        problems.append(
+            f"search_distance must be one of {', '.join(DISTANCES)}, "
+            f"got {search.distance!r}"
+        )
+    for name in search.locations:
+        try:
+            location_id(name)
+        except ValueError as e:
+            problems.append(str(e))
+    if not 0 < config.email.port < 65536:
+        problems.append(f"email_port must be 1-65535, got {config.email.port}")
+    if not any(r.strip() for r in config.email.recipients):
+        problems.append("recipients is empty")
+    if config.apply.workers < 1:
+        problems.append(f"apply_workers must be at least 1, got {config.apply.workers}")
+    # filters imports this module for FilterConfig
+    from .filters import compile_filters
+
+    try:
+        compile_filters(search.filters)
+    except ValueError as e:
+        problems.append(str(e))
+    if problems:
+        raise ValueError("; ".join(problems))
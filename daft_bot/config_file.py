@@ -0,0 +1,153 @@
+"""
+Every profile in one TOML file, instead of .env plus an override per profile.
+
+Usage:
+    daft-bot --config daft_bot.toml                   # run every profile
+    daft-bot --config daft_bot.toml --profiles 2bhk   # or some of them
+    daft-bot serve --config daft_bot.toml             # reloads on change
+
+Keys are the variable names from .env.example. Top-level keys are the
+base every profile inherits; each [profiles.<name>] table overrides some
+of them, and may inherit from another profile instead of the base:
+
+    email_server = "smtp.gmail.com"
+    rent_max_price = 2500
+    search_locations = ["RANELAGH_DUBLIN", "DUBLIN_4_DUBLIN"]
+
+    [profiles.2bhk]
+    rent_min_bedroom = 2
+    cache_file = "listings_2bhk.txt"
+
+    [profiles.3bhk]
+    inherit = "2bhk"
+    rent_min_bedroom = 3
+    cache_file = "listings_3bhk.txt"
+
+Lists are joined with commas and tables become "name:weight" pairs, so
+each profile goes through load_config exactly like an environment file.
+The whole file is checked before any profile is used: unknown keys,
+inheritance cycles, invalid values and profiles sharing a cache file are
+all reported together.
+"""
+
+import tomllib
+from collections.abc import Mapping
+from pathlib import Path
+
+from .config import AppConfig, load_config
+from .logger import get_logger
+
+log = get_logger(__name__)
+
+DEFAULT_PROFILE = "default"  # name of the base when there are no profiles
+
+
+class _KeyRecorder(dict):
+    """Mapping that remembers which keys load_config asked for."""
+
+    def __init__(self, values: Mapping[str, str]) -> None:
+        super().__init__(values)
+        self.read: set[str] = set()
+
+    def get(self, key, default=None):
+        self.read.add(key)
+        return super().get(key, default)
+
+
+def _env_value(value: object) -> str:
+    """Render a TOML value the way it would be written in an .env file."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, list):
+        return ",".join(_env_value(item) for item in value)
+    if isinstance(value, dict):
+        return ",".join(f"{name}:{weight}" for name, weight in value.items())
+    return str(value)
+
+
+def _resolve(
+    name: str, base: dict, tables: dict[str, dict], seen: tuple[str, ...] = ()
+) -> dict:
+    """A profile's settings with everything it inherits filled in."""
+    if name in seen:
+        raise ValueError(f"inheritance cycle: {' -> '.join(seen + (name,))}")
+    table = dict(tables[name])
+    parent = table.pop("inherit", None)
+    if parent is None:
+        return {**base, **table}
+    if parent not in tables:
+        raise ValueError(f"inherits from unknown profile {parent!r}")
+    return {**_resolve(parent, base, tables, seen + (name,)), **table}
+
+
+def load_profiles(path: str) -> dict[str, AppConfig]:
+    """
+    Parse and validate every profile in a TOML config file.
+
+    Raises ValueError describing every invalid profile; nothing is
+    returned unless the whole file is usable.
+    """
+    with open(path, "rb") as f:
+        document = tomllib.load(f)
+
+    tables = document.pop("profiles", {}) or {DEFAULT_PROFILE: {}}
+    configs: dict[str, AppConfig] = {}
+    known: set[str] = set()
+    problems = []
+    for name in tables:
+        try:
+            settings = _resolve(name, document, tables)
+            env = _KeyRecorder({k: _env_value(v) for k, v in settings.items()})
+            configs[name] = load_config(env)
+            known = env.read  # load_config reads every setting it supports
+        except ValueError as e:
+            problems.append(f"[{name}] {e}")
+
+    # Typos would otherwise be silently ignored
+    if known:
+        for name, table in {"base": document, **tables}.items():
+            unknown = sorted(set(table) - known - {"inherit"})
+            if unknown:
+                problems.append(f"[{name}] unknown setting(s): {', '.join(unknown)}")
+
+    owners: dict[str, str] = {}
+    for name, config in configs.items():
+        cache_file = str(Path(config.daft_search.cache_file).resolve())
+        if cache_file in owners:
+            problems.append(
+                f"[{name}] cache_file is also used by [{owners[cache_file]}]"
+            )
+        owners.setdefault(cache_file, name)
+
+    if problems:
+        raise ValueError(f"{path}: " + "; ".join(problems))
+    return configs
+
+
+class ConfigWatcher:
+    """Reloads a config file when its modification time changes."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._mtime = self._stat()
+
+    def _stat(self) -> int:
+        try:
+            return Path(self.path).stat().st_mtime_ns
+        except OSError:
+            return 0
+
+    def poll(self) -> dict[str, AppConfig] | None:
+        """The new profiles if the file changed and is valid, else None."""
+        mtime = self._stat()
+        if mtime == self._mtime:
+            return None
+        self._mtime = mtime
+        try:
+            configs = load_profiles(self.path)
+        except (OSError, ValueError) as e:
+            # tomllib.TOMLDecodeError is a ValueError too
+            log.error("Keeping the current profiles, %s is invalid: %s", self.path, e)
+            return None
+        log.info("Reloaded %s", self.path)
+        return configs
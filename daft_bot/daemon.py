@@ -0,0 +1,287 @@
+"""
+Long-running polling mode.
+
+Usage:
+    daft-bot serve --profiles .2bhk.env .3bhk.env --interval 300
+    daft-bot serve --config daft_bot.toml
+
+Every profile is loaded once: its config, cache and (unless --noop) its
+logged-in browsers stay in memory, so each poll only pays for the search.
+With --config, the file is checked before every poll and, when it has
+changed and is still valid, profiles are added, reopened or closed to
+match it without restarting.
+"""
+
+import argparse
+import heapq
+import random
+import signal
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from time import time
+from typing import TYPE_CHECKING
+
+from . import metrics
+from .cache import ListingCache, load_cache
+from .config import AppConfig, load_config
+from .config_file import ConfigWatcher
+from .email_notification import EmailNotifier
+from .logger import get_logger
+from .ledger import Ledger, close_ledgers, open_ledgers
+from .http_cache import post_json
+from .main import load_config_file, read_environment, run_cycle
+from .prefetch import ImagePrefetcher, create_prefetcher
+from .replay import Recording
+
+if TYPE_CHECKING:
+    from .workers import ApplicationPool
+
+log = get_logger(__name__)
+
+PROFILE_GLOB = ".*bhk.env"
+IDLE_CHECK_INTERVAL = 10  # seconds between config checks with no profiles left
+
+
+@dataclass
+class Profile:
+    """State kept in memory for one override file between polls."""
+
+    name: str
+    config: AppConfig
+    cache: ListingCache
+    email_notifier: EmailNotifier
+    pool: "ApplicationPool | None"
+    prefetcher: ImagePrefetcher | None = None
+    ledger: Ledger | None = None
+
+
+def discover_profiles(directory: str = ".") -> list[str]:
+    """Find override files such as .2bhk.env in the given directory."""
+    return sorted(str(path) for path in Path(directory).glob(PROFILE_GLOB))
+
+
+def load_profile(args: argparse.Namespace, override_file: str | None) -> Profile:
+    """Load config, cache and browser session holder for one profile."""
+    name = Path(override_file).stem.lstrip(".") if override_file else "default"
+    with metrics.span("config_load", profile=name):
+        config = load_config(read_environment(args.env, override_file))
+    return open_profile(args, name, config)
+
+
+def open_profile(args: argparse.Namespace, name: str, config: AppConfig) -> Profile:
+    """Create the notifier, browser pool and cache of a loaded profile."""
+    email_notifier = EmailNotifier(config.email)
+
+    pool = None
+    if not args.noop:
+        from .workers import ApplicationPool
+
+        pool = ApplicationPool(
+            config=config,
+            email_notifier=email_notifier,
+            headless=not args.visible,
+            keep_alive=True,
+        )
+
+    with metrics.span("cache_load", profile=name):
+        cache = load_cache(
+            config.daft_search.cache_file, bloom=config.daft_search.cache_bloom
+        )
+
+    log.info("Loaded profile: %s", name)
+    return Profile(
+        name=name,
+        config=config,
+        cache=cache,
+        email_notifier=email_notifier,
+        pool=pool,
+        prefetcher=create_prefetcher(config),
+    )
+
+
+def close_profile(profile: Profile) -> None:
+    if profile.pool:
+        profile.pool.close()
+    profile.email_notifier.close()
+    if profile.prefetcher:
+        profile.prefetcher.close()
+    profile.cache.close()
+
+
+def _shared_ledger(config: AppConfig, ledgers: list[Ledger | None]) -> Ledger | None:
+    """The open ledger for config's ledger_file, opening it if needed."""
+    path = config.apply.ledger_file
+    if not path:
+        return None
+    for ledger in ledgers:
+        if ledger is not None and ledger.path == path:
+            return ledger
+    ledger = Ledger(path)
+    ledgers.append(ledger)
+    return ledger
+
+
+def _close_unused_ledgers(
+    profiles: dict[str, Profile], ledgers: list[Ledger | None]
+) -> None:
+    """Close and forget the ledgers no remaining profile uses."""
+    in_use = [profile.ledger for profile in profiles.values()]
+    unused = [l for l in ledgers if l is not None and all(l is not u for u in in_use)]
+    close_ledgers(unused)
+    ledgers[:] = [l for l in ledgers if l is not None and l not in unused]
+
+
+def reload_profiles(
+    args: argparse.Namespace,
+    profiles: dict[str, Profile],
+    configs: dict[str, AppConfig],
+    ledgers: list[Ledger | None],
+    schedule: list[tuple[float, str]],
+) -> None:
+    """
+    Switch to the profiles of a changed config file.
+
+    Unchanged profiles keep their browsers and cache. Changed ones are
+    closed and reopened, so two caches are never open on the same file
+    (if the new settings fail to open, the old ones are reopened). New
+    ones are polled straight away and removed ones are closed, together
+    with ledgers no profile uses any more; their schedule entries are
+    dropped when they come due.
+    """
+    if args.profiles:
+        configs = {n: c for n, c in configs.items() if n in args.profiles}
+    for name in [name for name in profiles if name not in configs]:
+        log.info("Removing profile: %s", name)
+        close_profile(profiles.pop(name))
+
+    for name, config in configs.items():
+        old = profiles.get(name)
+        if old is not None and old.config == config:
+            continue
+        if old is not None:
+            close_profile(profiles.pop(name))
+        try:
+            profile = open_profile(args, name, config)
+        except Exception as e:
+            log.error("Unable to reload profile %s: %s", name, e)
+            if old is None:
+                continue
+            try:
+                profile = open_profile(args, name, old.config)
+            except Exception as e:
+                log.error("Unable to reopen profile %s: %s", name, e)
+                continue
+        profile.ledger = _shared_ledger(profile.config, ledgers)
+        if profile.pool:
+            profile.pool.start()
+        profiles[name] = profile
+        if all(scheduled != name for _, scheduled in schedule):
+            heapq.heappush(schedule, (time(), name))
+
+    _close_unused_ledgers(profiles, ledgers)
+
+
+def next_delay(interval: int, jitter: int) -> float:
+    """Seconds until the next poll, spread by +/- jitter."""
+    return max(1.0, interval + random.uniform(-jitter, jitter))
+
+
+def serve(args: argparse.Namespace) -> None:
+    """Poll every profile on its own jittered schedule until stopped."""
+    watcher = None
+    if args.config:
+        with metrics.span("config_load"):
+            configs = load_config_file(args)
+        profiles = {
+            name: open_profile(args, name, config) for name, config in configs.items()
+        }
+        watcher = ConfigWatcher(args.config)
+    else:
+        override_files = args.profiles or discover_profiles()
+        if not override_files:
+            override_files = [None]
+        loaded = [load_profile(args, override_file) for override_file in override_files]
+        profiles = {profile.name: profile for profile in loaded}
+
+    ledgers = open_ledgers([profile.config for profile in profiles.values()])
+    for profile, ledger in zip(profiles.values(), ledgers):
+        profile.ledger = ledger
+    for profile in profiles.values():
+        if profile.pool:
+            profile.pool.start()
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+
+    # Stagger the first round so profiles don't all poll at once
+    now = time()
+    schedule = [(now + random.uniform(0, args.jitter), name) for name in profiles]
+    heapq.heapify(schedule)
+
+    log.info("===== DAFT BOT SERVING %s PROFILE(S) =====", len(profiles))
+
+    try:
+        while not stop.is_set():
+            if not schedule:
+                # A reload removed every profile; wait for one to be added
+                log.warning("No profiles left, waiting for %s to change", args.config)
+                while not schedule:
+                    if stop.wait(IDLE_CHECK_INTERVAL):
+                        break
+                    configs = watcher.poll()
+                    if configs is not None:
+                        reload_profiles(args, profiles, configs, ledgers, schedule)
+                continue
+
+            due, name = schedule[0]
+            if stop.wait(max(0.0, due - time())):
+                break
+
+            # Edits to the config file apply from the next poll on
+            configs = watcher.poll() if watcher else None
+            if configs is not None:
+                reload_profiles(args, profiles, configs, ledgers, schedule)
+                continue
+            if name not in profiles:
+                heapq.heappop(schedule)  # removed by a reload
+                continue
+
+            profile = profiles[name]
+            start_time = time()
+            recording = Recording(args.record, profile.name) if args.record else None
+            try:
+                run_cycle(
+                    profile.config,
+                    profile.cache,
+                    profile.email_notifier,
+                    profile.pool,
+                    use_cached_values=args.fast,
+                    prefetcher=profile.prefetcher,
+                    ledger=profile.ledger,
+                    post=recording.post if recording else post_json,
+                )
+            except Exception as e:
+                log.error("Poll failed for %s: %s", profile.name, e)
+                if profile.pool:
+                    profile.pool.close()
+            finally:
+                if recording is not None:
+                    recording.close()
+
+            elapsed = round(time() - start_time, 2)
+            metrics.record("run", elapsed, profile=profile.name)
+            metrics.export()
+            log.info("Polled %s in %s seconds", profile.name, elapsed)
+            heapq.heapreplace(
+                schedule, (time() + next_delay(args.interval, args.jitter), name)
+            )
+
+    except KeyboardInterrupt:
+        pass
+
+    finally:
+        for profile in profiles.values():
+            close_profile(profile)
+        close_ledgers(ledgers)
+        log.info("===== DAFT BOT STOPPED =====")
@@ -0,0 +1,136 @@
+"""
+The parts of daftlistings the bot needs, without importing the package.
+
+Usage:
+    from .daft_api import Listing, search_payload
+
+`import daftlistings` takes over a second: its __init__ pulls in folium
+and numpy for map plotting and builds a Location enum with over 4,000
+members. Cron runs paid that on every start. Listing is loaded from
+daftlistings/listing.py alone, under its usual module name, so it is the
+same class if the full package is imported later. Search payloads are
+built here and match Daft._make_payload for the filters the bot sets,
+and monthly_price reads rents the way Listing.monthly_price does.
+"""
+
+import importlib.util
+import re
+import sys
+from pathlib import Path
+
+# Daft._ENDPOINT, Daft._HEADER and Daft._PAGE_SZ
+ENDPOINT = "https://gateway.daft.ie/api/v2/ads/listings"
+HEADERS = {
+    "User-Agent": "",
+    "Content-Type": "application/json",
+    "brand": "daft",
+    "platform": "web",
+}
+PAGE_SIZE = 50
+
+RESIDENTIAL_RENT = "residential-to-rent"  # SearchType.RESIDENTIAL_RENT
+PUBLISH_DATE_DESC = "publishDateDesc"  # SortType.PUBLISH_DATE_DESC
+
+# Stored-shape IDs of the Location members the bot searches by default
+LOCATION_IDS = {
+    "RANELAGH_DUBLIN": "2259",
+    "BALLSBRIDGE_DUBLIN": "2051",
+    "DUBLIN_4_DUBLIN": "68",
+    "DUBLIN_2_DUBLIN": "66",
+    "DONNYBROOK_DUBLIN": "1872",
+    "RATHMINES_DUBLIN": "2264",
+    "GRAND_CANAL_DOCK_DUBLIN": "862",
+}
+# Distance member -> suffix added to the location ID
+DISTANCES = {
+    "KM0": "",
+    "KM1": "_1000",
+    "KM3": "_3000",
+    "KM5": "_5000",
+    "KM10": "_10000",
+    "KM20": "_20000",
+}
+
+_NUMBER = re.compile(r"\d+")
+
+
+def _load_listing_class() -> type:
+    module = sys.modules.get("daftlistings.listing")
+    if module is None:
+        # find_spec locates the package without running its __init__
+        package = importlib.util.find_spec("daftlistings")
+        path = Path(package.submodule_search_locations[0]) / "listing.py"
+        spec = importlib.util.spec_from_file_location("daftlistings.listing", path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[spec.name] = module
+        spec.loader.exec_module(module)
+    return module.Listing
+
+
+Listing = _load_listing_class()
+
+
+def first_number(value: object) -> int | None:
+    """The first whole number in strings like '2 Bed' or '€1,500 per month'."""
+    if not value:
+        return None
+    match = _NUMBER.search(str(value).replace(",", ""))
+    return int(match.group()) if match else None
+
+
+def monthly_price(result: dict) -> int | None:
+    """
+    Monthly rent of a search result, or None if it states no amount.
+
+    Weekly rents are converted as in Listing.monthly_price, which raises
+    or returns a string instead for "Price on Application" and the like.
+    """
+    price = result.get("price") or ""
+    amount = first_number(price)
+    if amount is not None and price.lower().endswith("week"):
+        amount = amount * 30 // 7
+    return amount
+
+
+def location_id(name: str) -> str:
+    """Stored-shape ID of a daftlistings Location member, e.g. "DUBLIN_4_DUBLIN"."""
+    if name in LOCATION_IDS:
+        return LOCATION_IDS[name]
+    # Anything else needs the full enum (and the slow import)
+    from daftlistings import Location
+
+    try:
+        return Location[name].value["id"]
+    except KeyError:
+        raise ValueError(f"Unknown Daft location {name!r}") from None
+
+
+def search_payload(
+    locations: tuple[str, ...],
+    distance: str,
+    min_beds: int,
+    max_beds: int,
+    min_baths: int,
+    max_price: int,
+    sort: str | None = None,
+) -> dict:
+    """First page of a residential rent search, as Daft(...)._make_payload()."""
+    shape_ids: list[str] = []
+    for name in locations:
+        shape_id = location_id(name) + DISTANCES[distance]
+        if shape_id not in shape_ids:
+            shape_ids.append(shape_id)
+
+    payload = {
+        "section": RESIDENTIAL_RENT,
+        "ranges": [
+            {"name": "numBeds", "from": str(min_beds), "to": str(max_beds)},
+            {"name": "numBaths", "from": str(min_baths), "to": str(10e8)},
+            {"name": "rentalPrice", "from": "0", "to": str(max_price)},
+        ],
+        "geoFilter": {"storedShapeIds": shape_ids, "geoSearchType": "STORED_SHAPES"},
+    }
+    if sort:
+        payload["sort"] = sort
+    payload["paging"] = {"from": "0", "pagesize": str(PAGE_SIZE)}
+    return payload
@@ -0,0 +1,84 @@
+"""
+Chromedriver resolution without network access on every run.
+
+webdriver_manager resolves versions over the network and checks the
+filesystem each time it is called. Instead the resolved driver path is
+cached next to a fingerprint of the installed Chrome binary, and
+webdriver_manager is only imported when Chrome changes.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+from pathlib import Path
+
+from .logger import get_logger
+
+log = get_logger(__name__)
+
+CHROME_CANDIDATES = (
+    "google-chrome",
+    "google-chrome-stable",
+    "chromium",
+    "chromium-browser",
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+)
+
+
+def find_chrome() -> Path | None:
+    """Locate the installed Chrome binary."""
+    for candidate in CHROME_CANDIDATES:
+        found = shutil.which(candidate) or (
+            candidate if os.path.isfile(candidate) else None
+        )
+        if found:
+            return Path(found).resolve()
+    return None
+
+
+def chrome_fingerprint() -> str | None:
+    """Hash of Chrome's path, size and mtime; changes whenever Chrome is updated."""
+    chrome = find_chrome()
+    if chrome is None:
+        return None
+    stat = chrome.stat()
+    key = f"{chrome}:{stat.st_size}:{stat.st_mtime_ns}:{sys.platform}"
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def resolve_chromedriver(pinned_path: str = "", cache_file: str = "") -> str:
+    """
+    Return the chromedriver path to use.
+
+    A pinned path always wins. Otherwise a cached path is reused while the
+    Chrome fingerprint matches, and webdriver_manager is only consulted
+    (and its result cached) when it doesn't.
+    """
+    if pinned_path:
+        return pinned_path
+
+    fingerprint = chrome_fingerprint()
+    if cache_file and fingerprint:
+        try:
+            with open(cache_file, "r") as f:
+                cached = json.load(f)
+            if cached.get("chrome") == fingerprint and os.path.isfile(cached["driver"]):
+                log.debug("Using cached chromedriver: %s", cached["driver"])
+                return cached["driver"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    log.info("Resolving chromedriver with webdriver_manager")
+    driver_path = ChromeDriverManager().install()
+
+    if cache_file and fingerprint:
+        try:
+            with open(cache_file, "w") as f:
+                json.dump({"chrome": fingerprint, "driver": driver_path}, f)
+        except OSError as e:
+            log.warning("Unable to cache chromedriver path: %s", e)
+    return driver_path
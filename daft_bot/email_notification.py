@@ -1,58 +1,230 @@
 from email.message import EmailMessage
+from pathlib import Path
+from queue import Empty, Full, Queue
 import smtplib
-import sys
-from daftlistings import Listing
+import threading
+from .daft_api import Listing
+from . import metrics
 from .config import EmailConfig
 from .logger import get_logger
+from .outbox import Outbox
 
 log = get_logger(__name__)
 
 
 class EmailNotifier:
-    """Handles email notifications for Daft listings."""
+    """
+    Handles email notifications for Daft listings.
+
+    Messages are written to a disk-backed outbox and delivered by a
+    background thread, so notify() returns straight away and applications
+    never wait on the mail server. Delivery is retried with exponential
+    backoff; anything still undelivered stays in the outbox and is sent
+    on the next run. One authenticated SMTP connection is reused while
+    messages keep coming and dropped after IDLE_TIMEOUT seconds.
+
+    Error notifications are collected and sent as a single digest by
+    flush(), so a run with many failed applications sends one email
+    instead of one per listing. Call close() before exiting to deliver
+    what is queued.
+    """
+
+    QUEUE_SIZE = 100  # messages waiting in memory; the rest wait on disk
+    MAX_ATTEMPTS = 5
+    BACKOFF = 2.0  # seconds, doubled after each failed attempt
+    MAX_BACKOFF = 60.0
+    IDLE_TIMEOUT = 30.0  # seconds before an unused connection is closed
+    DRAIN_TIMEOUT = 60.0  # seconds close() waits for queued messages
+    SMTP_TIMEOUT = 30
 
     def __init__(self, config: EmailConfig):
         """Initialize EmailNotifier with configuration."""
         self.config = config
+        self._outbox = Outbox(config.outbox_dir)
+        self._queue: Queue[Path | None] = Queue(maxsize=self.QUEUE_SIZE)
+        self._worker: threading.Thread | None = None
+        self._stopping = threading.Event()
+        self._overflow = threading.Event()
+        self._queued: set[Path] = set()  # in the queue, so never put twice
+        self._deferred: set[Path] = set()  # gave up on, until a send works
+        self._server: smtplib.SMTP | None = None
+        self._failed: list[Listing] = []
+        # Application workers report failures from several threads
+        self._lock = threading.RLock()
 
     def notify(self, listings: list[Listing]) -> None:
-        """Send notification email about new listings."""
+        """Queue a notification email about new listings."""
         if len(listings) > 0:
             msg = self._build_listings_message(listings)
-            self._send_email(msg)
+            self._enqueue(msg)
 
     def error_notify(self, listing: Listing) -> None:
-        """Send notification email when automated message fails."""
-        msg = self._build_error_message(listing)
-        self._send_email(msg)
+        """Queue a listing the automated message failed for; sent by flush()."""
+        with self._lock:
+            self._failed.append(listing)
 
-    def _create_smtp_connection(self) -> smtplib.SMTP:
-        """Create and configure SMTP connection."""
+    def flush(self) -> None:
+        """Queue one email for all failures reported since the last flush."""
+        with self._lock:
+            failed, self._failed = self._failed, []
+        if failed:
+            self._enqueue(self._build_error_message(failed))
+
+    def close(self) -> None:
+        """Queue pending error notifications and wait for delivery to finish."""
+        self.flush()
+        with self._lock:
+            worker, self._worker = self._worker, None
+        if worker is None:
+            return
+
+        self._queue.put(None)
+        worker.join(self.DRAIN_TIMEOUT)
+        if worker.is_alive():
+            # Abort retries; whatever is left is sent on the next run
+            self._stopping.set()
+            worker.join()
+            self._stopping.clear()
+        left = len(self._outbox.pending())
+        if left:
+            log.warning("%s email(s) left in the outbox for the next run", left)
+
+    # =========================================================================
+    # Delivery
+    # =========================================================================
+
+    def _enqueue(self, msg: EmailMessage) -> None:
+        """Store a message in the outbox and hand it to the delivery thread."""
         try:
-            server = smtplib.SMTP(self.config.server, self.config.port)
-        except ValueError as e:
-            log.error(f"Configuration error: {e}")
-            sys.exit(1)
-        except Exception as e:
-            log.error(f"Unable to connect to email server: {e}")
-            sys.exit(1)
+            path = self._outbox.put(msg.as_string(unixfrom=True))
+        except OSError as e:
+            log.error("Unable to queue email: %s", e)
+            return
+
+        self._ensure_worker()
+        if not self._put(path):
+            # Still on disk; picked up once the queue has drained
+            log.warning("Notification queue full, email kept in the outbox")
+            self._overflow.set()
+
+    def _put(self, path: Path) -> bool:
+        """Queue a message unless it is already queued; False if the queue is full."""
+        with self._lock:
+            if path in self._queued or path in self._deferred:
+                return True
+            try:
+                self._queue.put_nowait(path)
+            except Full:
+                return False
+            self._queued.add(path)
+            return True
+
+    def _ensure_worker(self) -> None:
+        """Start the delivery thread, picking up messages left by earlier runs."""
+        with self._lock:
+            if self._worker is not None:
+                return
+            self._overflow.set()
+            self._worker = threading.Thread(
+                target=self._run, name="email-outbox", daemon=True
+            )
+            self._worker.start()
 
+    def _enqueue_pending(self) -> None:
+        """Queue outbox files that aren't in the queue yet, as space allows."""
+        self._overflow.clear()
+        for path in self._outbox.pending():
+            if not self._put(path):
+                self._overflow.set()
+                return
+
+    def _run(self) -> None:
+        """Delivery thread: send queued messages until close() is called."""
+        while not self._stopping.is_set():
+            if self._overflow.is_set() and self._queue.empty():
+                self._enqueue_pending()
+            try:
+                path = self._queue.get(timeout=self.IDLE_TIMEOUT)
+            except Empty:
+                self._disconnect()
+                continue
+            if path is None:
+                # Closing: send everything still on disk, including overflow
+                for path in self._outbox.pending():
+                    if self._stopping.is_set():
+                        break
+                    if path not in self._deferred:
+                        self._deliver(path)
+                break
+            with self._lock:
+                self._queued.discard(path)
+            self._deliver(path)
+        self._disconnect()
+
+    def _deliver(self, path: Path) -> None:
+        """Send one outbox message, retrying with exponential backoff."""
+        message = self._outbox.read(path)
+        if message is None:
+            return  # queued twice and already sent
+
+        for attempt in range(self.MAX_ATTEMPTS):
+            try:
+                with metrics.span("email_send"):
+                    self._send_email(message)
+                self._outbox.remove(path)
+                log.info("Email sent successfully")
+                with self._lock:
+                    if self._deferred:
+                        # The server is back, try the ones given up on again
+                        self._deferred.clear()
+                        self._overflow.set()
+                return
+            except Exception as e:
+                self._disconnect()
+                delay = min(self.MAX_BACKOFF, self.BACKOFF * 2**attempt)
+                log.warning("Unable to send email (%s), retrying in %.0fs", e, delay)
+                if self._stopping.wait(delay):
+                    break
+        log.error("Giving up on %s for now, it stays in the outbox", path.name)
+        with self._lock:
+            self._deferred.add(path)
+
+    def _create_smtp_connection(self) -> smtplib.SMTP:
+        """Create and configure SMTP connection."""
+        server = smtplib.SMTP(
+            self.config.server, self.config.port, timeout=self.SMTP_TIMEOUT
+        )
         server.ehlo()
         server.starttls()
         server.ehlo()
         server.login(self.config.user, self.config.password)
         return server
 
-    def _send_email(self, msg: EmailMessage) -> None:
-        """Send email using SMTP."""
-        server = self._create_smtp_connection()
+    def _disconnect(self) -> None:
+        """Quit the pooled connection, if any."""
+        if self._server is None:
+            return
         try:
-            server.sendmail(
-                self.config.sender, self.config.recipients, msg.as_string(unixfrom=True)
-            )
-        finally:
-            server.quit()
-        log.info("Email sent successfully")
+            self._server.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+        self._server = None
+
+    def _send_email(self, message: str) -> None:
+        """Send over the pooled connection, reconnecting once if it was dropped."""
+        for attempt in range(2):
+            if self._server is None:
+                self._server = self._create_smtp_connection()
+            try:
+                self._server.sendmail(
+                    self.config.sender, self.config.recipients, message
+                )
+                return
+            except smtplib.SMTPServerDisconnected:
+                self._server = None
+                if attempt:
+                    raise
+                log.info("SMTP connection closed by server, reconnecting")
 
     def _build_listings_message(self, listings: list[Listing]) -> EmailMessage:
         """Build email message for listing notifications."""
@@ -64,7 +236,7 @@ class EmailNotifier:
                     if "size720x480" in img:
                         text += f"\n{img['size720x480']}\n"
             except Exception as e:
-                log.warning(f"Error processing listing images: {e}")
+                log.warning("Error processing listing images: %s", e)
 
         msg = EmailMessage()
         msg["From"] = f"Daft Notification : <{self.config.sender}>"
@@ -73,10 +245,11 @@ class EmailNotifier:
         msg.set_content(text)
         return msg
 
-    def _build_error_message(self, listing: Listing) -> EmailMessage:
-        """Build email message for error notifications."""
-        text = "Unable to send automated message to agent\n"
-        text += f"-----\n{listing.title}\n{listing.daft_link}\n{listing.price}\n"
+    def _build_error_message(self, listings: list[Listing]) -> EmailMessage:
+        """Build one email message for all failed listings."""
+        text = f"Unable to send automated message to agent for {len(listings)} ad(s)\n"
+        for listing in listings:
+            text += f"-----\n{listing.title}\n{listing.daft_link}\n{listing.price}\n"
 
         msg = EmailMessage()
         msg["From"] = f"Daft Notification : <{self.config.sender}>"
@@ -0,0 +1,132 @@
+"""
+Local listing filters for what Daft's search API can't express.
+
+Usage:
+    wanted = compile_filters(config.daft_search.filters)
+    listings = [listing for listing in listings if wanted(listing)]
+
+Rules come from the profile's env file and are compiled once into a list
+of predicates (precompiled regexes, numeric ranges, a geo radius), so
+checking a listing is a handful of dict lookups. Listings missing the
+field a rule looks at are kept, the same as the beds/baths/price check
+in search.matches.
+"""
+
+import math
+import re
+from collections.abc import Callable
+
+from .daft_api import Listing, monthly_price
+
+from .config import FilterConfig
+
+Predicate = Callable[[dict], bool]
+
+# Best to worst; exempt or unknown ratings aren't in the list
+BER_RATINGS = tuple("A1 A2 A3 B1 B2 B3 C1 C2 C3 D1 D2 E1 E2 F G".split())
+_BER_RANK = {rating: rank for rank, rating in enumerate(BER_RATINGS)}
+
+_EARTH_RADIUS_KM = 6371.0
+
+
+def _regex(setting: str, pattern: str) -> re.Pattern:
+    try:
+        return re.compile(pattern, re.IGNORECASE)
+    except re.error as e:
+        raise ValueError(f"{setting} is not a valid regex: {e}") from e
+
+
+def _title_excludes(pattern: re.Pattern) -> Predicate:
+    return lambda result: not pattern.search(result.get("title") or "")
+
+
+def _title_requires(pattern: re.Pattern) -> Predicate:
+    return lambda result: bool(pattern.search(result.get("title") or ""))
+
+
+def _property_type_not_in(types: frozenset[str]) -> Predicate:
+    return lambda result: (result.get("propertyType") or "").lower() not in types
+
+
+def _ber_at_least(worst: str) -> Predicate:
+    if worst not in _BER_RANK:
+        raise ValueError(f"filter_worst_ber must be A1 to G, got {worst!r}")
+    limit = _BER_RANK[worst]
+
+    def check(result: dict) -> bool:
+        rank = _BER_RANK.get((result.get("ber") or {}).get("rating"))
+        return rank is None or rank <= limit
+
+    return check
+
+
+def _price_at_least(minimum: int) -> Predicate:
+    def check(result: dict) -> bool:
+        amount = monthly_price(result)
+        return amount is None or amount >= minimum
+
+    return check
+
+
+def _floor_area_between(minimum: int, maximum: int) -> Predicate:
+    def check(result: dict) -> bool:
+        area = result.get("floorArea") or {}
+        if area.get("unit") != "METRES_SQUARED":
+            return True
+        value = float(area.get("value", 0))
+        return minimum <= value and (not maximum or value <= maximum)
+
+    return check
+
+
+def _within_radius(lat: float, lon: float, radius_km: float) -> Predicate:
+    # Equirectangular approximation: exact enough over a few km, no trig per listing
+    cos_lat = math.cos(math.radians(lat))
+    limit = (radius_km / _EARTH_RADIUS_KM) ** 2
+
+    def check(result: dict) -> bool:
+        coordinates = (result.get("point") or {}).get("coordinates")
+        if not coordinates:
+            return True
+        x = math.radians(coordinates[0] - lon) * cos_lat
+        y = math.radians(coordinates[1] - lat)
+        return x * x + y * y <= limit
+
+    return check
+
+
+def compile_filters(config: FilterConfig) -> Callable[[Listing], bool]:
+    """
+    Build one predicate that is True for listings every rule keeps.
+
+    Raises ValueError for a rule that can't be compiled.
+    """
+    predicates: list[Predicate] = []
+    if config.exclude_title:
+        pattern = _regex("filter_exclude_title", config.exclude_title)
+        predicates.append(_title_excludes(pattern))
+    if config.require_title:
+        pattern = _regex("filter_require_title", config.require_title)
+        predicates.append(_title_requires(pattern))
+    if config.exclude_property_types:
+        types = frozenset(t.lower() for t in config.exclude_property_types)
+        predicates.append(_property_type_not_in(types))
+    if config.worst_ber:
+        predicates.append(_ber_at_least(config.worst_ber))
+    if config.min_price:
+        predicates.append(_price_at_least(config.min_price))
+    if config.min_floor_area or config.max_floor_area:
+        predicates.append(
+            _floor_area_between(config.min_floor_area, config.max_floor_area)
+        )
+    if config.near and config.radius_km:
+        predicates.append(_within_radius(*config.near, config.radius_km))
+
+    if not predicates:
+        return lambda listing: True
+
+    def wanted(listing: Listing) -> bool:
+        result = listing.as_dict()
+        return all(predicate(result) for predicate in predicates)
+
+    return wanted
@@ -0,0 +1,186 @@
+"""
+On-disk cache for Daft search responses.
+
+Responses are keyed on the endpoint and serialized filter payload, stored
+one JSON file per key, and revalidated with ETag/Last-Modified. A
+Cache-Control max-age lets a fresh entry skip the request entirely.
+
+Usage:
+    cache = ResponseCache(".search_cache", ttl=3600)
+    body, unchanged = post_json(session, url, headers, payload, cache)
+"""
+
+import hashlib
+import json
+import os
+import re
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from time import time
+
+import requests
+
+from .logger import get_logger
+
+log = get_logger(__name__)
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+@dataclass
+class CachedResponse:
+    """A stored response body and the validators needed to revalidate it."""
+
+    body: dict
+    body_hash: str
+    etag: str | None = None
+    last_modified: str | None = None
+    fresh_until: float = 0.0
+
+
+class ResponseCache:
+    """
+    Directory of cached responses with a TTL and LRU eviction.
+
+    Entries unused for longer than ttl seconds are dropped, and the least
+    recently used entries go once there are more than max_entries.
+    """
+
+    def __init__(self, directory: str, ttl: int = 3600, max_entries: int = 256) -> None:
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(url: str, payload: dict) -> str:
+        """Stable key for a request: sha256 of URL and sorted JSON payload."""
+        serialized = json.dumps([url, payload], sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(serialized.encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> CachedResponse | None:
+        """Return a cached response unless missing, unreadable or expired."""
+        path = self._path(key)
+        try:
+            if time() - path.stat().st_mtime > self.ttl:
+                path.unlink(missing_ok=True)
+                return None
+            with open(path, "r") as f:
+                entry = CachedResponse(**json.load(f))
+            os.utime(path)  # Mark as recently used
+            return entry
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError) as e:
+            log.debug("Ignoring unreadable cached response %s: %s", key, e)
+            return None
+
+    def put(self, key: str, entry: CachedResponse) -> None:
+        """Atomically store a response, then evict old entries."""
+        path = self._path(key)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(asdict(entry), f)
+            os.replace(tmp_path, path)
+        except (IOError, OSError) as e:
+            log.warning("Unable to cache response: %s", e)
+            tmp_path.unlink(missing_ok=True)
+            return
+        self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        now = time()
+        for path in self.directory.glob("*.json"):
+            try:
+                mtime = path.stat().st_mtime
+                if now - mtime > self.ttl:
+                    path.unlink()
+                else:
+                    entries.append((mtime, path))
+            except FileNotFoundError:
+                pass  # Evicted by another thread
+
+        entries.sort()
+        for _, path in entries[: max(0, len(entries) - self.max_entries)]:
+            path.unlink(missing_ok=True)
+
+
+def _fresh_until(response: requests.Response) -> float | None:
+    """Expiry from Cache-Control, or None if the response must not be stored."""
+    cache_control = response.headers.get("Cache-Control", "").lower()
+    if "no-store" in cache_control:
+        return None
+    if "no-cache" in cache_control:
+        return 0.0
+    match = _MAX_AGE.search(cache_control)
+    return time() + int(match.group(1)) if match else 0.0
+
+
+def post_json(
+    session: requests.Session,
+    url: str,
+    headers: dict,
+    payload: dict,
+    cache: ResponseCache | None = None,
+    timeout: int = 30,
+) -> tuple[dict, bool]:
+    """
+    POST a JSON payload, using the cache when possible.
+
+    Returns the response body and whether it is unchanged since the
+    cached copy (served fresh, 304 Not Modified, or an identical body).
+    """
+    if cache is None:
+        response = session.post(url, headers=headers, json=payload, timeout=timeout)
+        response.raise_for_status()
+        return response.json(), False
+
+    key = cache.key(url, payload)
+    entry = cache.get(key)
+    if entry is not None and time() < entry.fresh_until:
+        return entry.body, True
+
+    request_headers = dict(headers)
+    if entry is not None:
+        if entry.etag:
+            request_headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            request_headers["If-Modified-Since"] = entry.last_modified
+
+    response = session.post(url, headers=request_headers, json=payload, timeout=timeout)
+
+    if response.status_code == 304 and entry is not None:
+        fresh_until = _fresh_until(response)
+        if fresh_until is not None:
+            entry.fresh_until = fresh_until
+            cache.put(key, entry)
+        return entry.body, True
+
+    response.raise_for_status()
+    body_hash = hashlib.sha256(response.content).hexdigest()
+    body = response.json()
+    unchanged = entry is not None and entry.body_hash == body_hash
+
+    fresh_until = _fresh_until(response)
+    if fresh_until is not None:
+        cache.put(
+            key,
+            CachedResponse(
+                body=body,
+                body_hash=body_hash,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+                fresh_until=fresh_until,
+            ),
+        )
+    return body, unchanged
+
+
+# post_json's signature; replay.py records and replays through the same hook
+PostJson = Callable[..., tuple[dict, bool]]
@@ -0,0 +1,116 @@
+"""
+Browserless enquiry submission.
+
+Usage:
+    submitter = HttpSubmitter(config, rate_limiter)
+    if submitter.load_session():
+        submitter.submit(listing)
+
+Sends the contact form as one JSON POST with the cookies DaftBot saved
+after logging in, over a pooled keep-alive session. Anything other than
+a 2xx response counts as a failure so the caller can fall back to the
+browser; a 401/403 also marks the session as signed out so the rest of
+the batch skips straight to the browser, which logs in again.
+"""
+
+from typing import TYPE_CHECKING
+
+import requests
+from requests.adapters import HTTPAdapter
+
+if TYPE_CHECKING:
+    from daftlistings import Listing
+
+from . import metrics
+from .cache import listing_id
+from .config import AppConfig
+from .logger import get_logger
+from .ratelimit import RateLimiter
+from .session import load_session
+
+log = get_logger(__name__)
+
+
+class HttpSubmitter:
+    """Submit enquiries with a direct HTTP request instead of Chrome."""
+
+    HEADERS = {
+        "Content-Type": "application/json",
+        "brand": "daft",
+        "platform": "web",
+    }
+    TIMEOUT = 10  # seconds
+
+    def __init__(self, config: AppConfig, rate_limiter: RateLimiter) -> None:
+        self.config = config
+        self.rate_limiter = rate_limiter
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=max(1, config.apply.workers))
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self._session.headers.update(self.HEADERS)
+        self.signed_in = False
+
+    def load_session(self) -> bool:
+        """Load the saved login cookies. Returns False if there are none."""
+        session_file = self.config.daft_account.session_file
+        saved = load_session(session_file) if session_file else None
+        if saved is None:
+            return False
+
+        self._session.cookies.clear()
+        for cookie in saved["cookies"]:
+            self._session.cookies.set(
+                cookie["name"],
+                cookie["value"],
+                domain=cookie.get("domain", ""),
+                path=cookie.get("path", "/"),
+            )
+        self.signed_in = True
+        return True
+
+    def _payload(self, listing: "Listing") -> dict:
+        account = self.config.daft_account
+        return {
+            "adId": listing_id(listing.daft_link),
+            "name": f"{account.first_name} {account.last_name}",
+            "firstName": account.first_name,
+            "lastName": account.last_name,
+            "email": account.email,
+            "phone": account.phone_number,
+            "message": account.message_text,
+            "adultTenants": 1,
+        }
+
+    def submit(self, listing: "Listing") -> bool:
+        """Send the enquiry for one listing. Returns True on a 2xx response."""
+        endpoint = self.config.apply.enquiry_endpoint
+        self.rate_limiter.wait(endpoint)
+        try:
+            with metrics.span("http_submit"):
+                response = self._session.post(
+                    endpoint, json=self._payload(listing), timeout=self.TIMEOUT
+                )
+        except requests.RequestException as e:
+            log.warning("HTTP enquiry failed for %s: %s", listing.daft_link, e)
+            return False
+
+        if response.status_code in (401, 403):
+            log.warning("Saved session rejected (%s)", response.status_code)
+            self.signed_in = False
+            return False
+
+        if not response.ok:
+            log.warning(
+                "HTTP enquiry rejected for %s: %s",
+                listing.daft_link,
+                response.status_code,
+            )
+            return False
+
+        log.info("Application submitted over HTTP: %s", listing.daft_link)
+        return True
+
+    def close(self) -> None:
+        """Close pooled connections."""
+        self._session.close()
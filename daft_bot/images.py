@@ -0,0 +1,222 @@
+"""
+Image manifest: every image URL seen for a listing, in SQLite.
+
+Usage:
+    save_images(listings, "images.db")
+    python -m daft_bot.images export images.db > images.jsonl
+    python -m daft_bot.images export images.db --listing 4679001
+
+Replaces the images.txt append log. Listings are keyed by their Daft ID
+and every size variant Daft returns is recorded, each URL only once.
+Reads stream rows from a cursor, so exporting or looking up one listing
+never loads the whole manifest. An existing images.txt is imported the
+first time the manifest is created.
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+from collections.abc import Iterator
+from contextlib import closing
+from pathlib import Path
+from time import time
+
+from .daft_api import Listing
+
+from .cache import listing_id
+from .logger import get_logger
+
+log = get_logger(__name__)
+
+LEGACY_IMAGES_FILE = "images.txt"
+LEGACY_SIZE = "size720x480"  # the only variant images.txt recorded
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS listings (
+    listing_id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    url TEXT NOT NULL,
+    saved_at INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS images (
+    listing_id INTEGER NOT NULL REFERENCES listings (listing_id),
+    position INTEGER NOT NULL,
+    size TEXT NOT NULL,
+    url TEXT NOT NULL UNIQUE
+);
+CREATE INDEX IF NOT EXISTS images_by_listing ON images (listing_id, position);
+CREATE TABLE IF NOT EXISTS downloads (
+    url TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL,
+    bytes INTEGER NOT NULL,
+    fetched_at INTEGER NOT NULL
+);
+"""
+
+
+class ImageManifest:
+    """SQLite store of listing image URLs, safe to share between profiles."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        created = not Path(path).exists()
+        # Runs for different profiles may write at the same time
+        self._db = sqlite3.connect(path, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        if created and Path(LEGACY_IMAGES_FILE).exists():
+            self.import_legacy(LEGACY_IMAGES_FILE)
+
+    def close(self) -> None:
+        self._db.close()
+
+    def add(self, listings: list[Listing]) -> int:
+        """Record the listings' images. Returns how many URLs were new."""
+        rows = []
+        with self._db:
+            for listing in listings:
+                ad_id = listing_id(listing.daft_link)
+                self._add_listing(ad_id, listing.title, listing.daft_link)
+                for position, image in enumerate(listing.images):
+                    rows.extend(
+                        (ad_id, position, size, url)
+                        for size, url in image.items()
+                        if size.startswith("size") and isinstance(url, str)
+                    )
+            before = self._db.total_changes
+            self._db.executemany(
+                "INSERT OR IGNORE INTO images (listing_id, position, size, url) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            return self._db.total_changes - before
+
+    def _add_listing(self, ad_id: int, title: str, url: str) -> None:
+        self._db.execute(
+            "INSERT OR IGNORE INTO listings (listing_id, title, url, saved_at) "
+            "VALUES (?, ?, ?, ?)",
+            (ad_id, title, url, int(time())),
+        )
+
+    def images_for(self, ad_id: int, size: str | None = None) -> list[str]:
+        """Image URLs of one listing in display order, optionally one size only."""
+        query = "SELECT url FROM images WHERE listing_id = ?"
+        params: tuple = (ad_id,)
+        if size:
+            query += " AND size = ?"
+            params += (size,)
+        query += " ORDER BY position, size"
+        return [url for (url,) in self._db.execute(query, params)]
+
+    def digest_for(self, url: str) -> str | None:
+        """SHA-256 of a downloaded image, if it has been prefetched."""
+        row = self._db.execute(
+            "SELECT sha256 FROM downloads WHERE url = ?", (url,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def record_downloads(self, downloads: list[tuple[str, str, int]]) -> None:
+        """Remember which (url, sha256, bytes) images have been prefetched."""
+        now = int(time())
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO downloads (url, sha256, bytes, fetched_at) "
+                "VALUES (?, ?, ?, ?)",
+                [(url, digest, size, now) for url, digest, size in downloads],
+            )
+
+    def iter_listings(self, ad_id: int | None = None) -> Iterator[dict]:
+        """
+        Stream listings with their images grouped by size.
+
+        Rows are read from the cursor as they are needed, one listing at a
+        time, in listing ID order.
+        """
+        query = (
+            "SELECT l.listing_id, l.title, l.url, i.size, i.url "
+            "FROM listings l LEFT JOIN images i ON i.listing_id = l.listing_id"
+        )
+        params: tuple = ()
+        if ad_id is not None:
+            query += " WHERE l.listing_id = ?"
+            params = (ad_id,)
+        query += " ORDER BY l.listing_id, i.position, i.size"
+
+        current = None
+        with closing(self._db.execute(query, params)) as cursor:
+            for ad, title, url, size, image_url in cursor:
+                if current is None or current["listing_id"] != ad:
+                    if current is not None:
+                        yield current
+                    current = {
+                        "listing_id": ad,
+                        "title": title,
+                        "url": url,
+                        "images": {},
+                    }
+                if image_url is not None:
+                    current["images"].setdefault(size, []).append(image_url)
+        if current is not None:
+            yield current
+
+    def import_legacy(self, images_file: str) -> None:
+        """Import the blocks written by the old images.txt append log."""
+        rows = []
+        with self._db, open(images_file, "r") as f:
+            blocks = f.read().split("=" * 50)
+            for block in blocks:
+                lines = [line.strip() for line in block.strip().splitlines()]
+                if len(lines) < 2:
+                    continue
+                title, url, *urls = lines
+                try:
+                    ad_id = listing_id(url)
+                except ValueError:
+                    continue
+                self._add_listing(ad_id, title, url)
+                rows.extend(
+                    (ad_id, position, LEGACY_SIZE, image)
+                    for position, image in enumerate(u for u in urls if u)
+                )
+            self._db.executemany(
+                "INSERT OR IGNORE INTO images (listing_id, position, size, url) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+        log.info("Imported %s image URL(s) from %s", len(rows), images_file)
+
+
+def save_images(listings: list[Listing], images_db: str = "images.db") -> None:
+    """Record listing images in the manifest."""
+    if not listings:
+        return
+
+    try:
+        manifest = ImageManifest(images_db)
+        try:
+            added = manifest.add(listings)
+        finally:
+            manifest.close()
+        log.info("Images saved for %s listing(s), %s new URL(s)", len(listings), added)
+    except (sqlite3.Error, OSError) as e:
+        log.error("Unable to save images: %s", e)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export the image manifest as JSONL")
+    parser.add_argument("command", choices=["export"])
+    parser.add_argument("manifest", nargs="?", default="images.db")
+    parser.add_argument("--listing", type=int, default=None, help="one listing ID")
+    args = parser.parse_args()
+
+    manifest = ImageManifest(args.manifest)
+    try:
+        for entry in manifest.iter_listings(args.listing):
+            sys.stdout.write(json.dumps(entry) + "\n")
+    finally:
+        manifest.close()
+
+
+if __name__ == "__main__":
+    main()
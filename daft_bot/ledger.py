@@ -0,0 +1,81 @@
+"""
+Ledger of listings claimed across profiles and processes.
+
+Usage:
+    ledger = Ledger("ledger.db")
+    if ledger.claim(listing.daft_link, owner=config.daft_search.cache_file):
+        ...  # notify and apply
+
+A listing matching several profiles (e.g. overlapping bed ranges) is
+only notified about and applied to by the first profile to claim it.
+Claims are single INSERT OR IGNORE statements in a shared SQLite file,
+so they are atomic between threads and between cron jobs running at
+the same time. The owning profile can claim its listings again, e.g. to
+retry a failed application.
+"""
+
+import sqlite3
+from time import time
+
+from .cache import listing_id
+from .config import AppConfig
+from .logger import get_logger
+
+log = get_logger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS claims (
+    listing_id INTEGER PRIMARY KEY,
+    owner TEXT NOT NULL,
+    claimed_at INTEGER NOT NULL
+);
+"""
+
+
+class Ledger:
+    """Shared record of which profile owns each listing."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+
+    def claim(self, key: str | int, owner: str) -> bool:
+        """Claim a listing for owner. False if another owner already has it."""
+        ident = listing_id(key)
+        self._db.execute(
+            "INSERT OR IGNORE INTO claims (listing_id, owner, claimed_at) "
+            "VALUES (?, ?, ?)",
+            (ident, owner, int(time())),
+        )
+        (current,) = self._db.execute(
+            "SELECT owner FROM claims WHERE listing_id = ?", (ident,)
+        ).fetchone()
+        return current == owner
+
+    def owner(self, key: str | int) -> str | None:
+        row = self._db.execute(
+            "SELECT owner FROM claims WHERE listing_id = ?", (listing_id(key),)
+        ).fetchone()
+        return row[0] if row else None
+
+    def close(self) -> None:
+        self._db.close()
+
+
+def open_ledgers(configs: list[AppConfig]) -> list[Ledger | None]:
+    """One ledger per profile, shared by profiles using the same file."""
+    opened: dict[str, Ledger] = {}
+    ledgers: list[Ledger | None] = []
+    for config in configs:
+        path = config.apply.ledger_file
+        if path and path not in opened:
+            opened[path] = Ledger(path)
+        ledgers.append(opened.get(path))
+    return ledgers
+
+
+def close_ledgers(ledgers: list[Ledger | None]) -> None:
+    for ledger in {id(l): l for l in ledgers if l is not None}.values():
+        ledger.close()
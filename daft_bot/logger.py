@@ -1,23 +1,94 @@
+import atexit
+import json
 import logging
+import queue
 import sys
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 # Create logger
 logger = logging.getLogger("daft_bot")
 
+# Identifies this process in logs and metrics
+RUN_ID = uuid.uuid4().hex[:12]
+
+_profile: ContextVar[str | None] = ContextVar("profile", default=None)
+_listing: ContextVar[str | None] = ContextVar("listing", default=None)
+_listener: QueueListener | None = None
+
+
+@contextmanager
+def log_context(
+    profile: str | None = None, listing: str | None = None
+) -> Iterator[None]:
+    """
+    Tag log records in this block with a profile and/or listing.
+
+    Context is per thread: worker threads set their own.
+    """
+    tokens = []
+    if profile is not None:
+        tokens.append((_profile, _profile.set(profile)))
+    if listing is not None:
+        tokens.append((_listing, _listing.set(listing)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+class _ContextFilter(logging.Filter):
+    """Copy the run, profile and listing IDs onto records in the logging thread."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.run_id = RUN_ID
+        record.profile = _profile.get()
+        record.listing = _listing.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, for log files meant to be parsed."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "run_id": getattr(record, "run_id", RUN_ID),
+            "profile": getattr(record, "profile", None),
+            "listing": getattr(record, "listing", None),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
 
 def setup_logging(
     log_file: str = "daft_bot.log",
     level: int = logging.INFO,
     max_bytes: int = 10 * 1024 * 1024,  # 10 MB
     backup_count: int = 3,
+    json_format: bool = False,
 ) -> None:
     """
     Configure logging for the application.
 
-    Logs to both console and file with rotation.
+    Logs to both console and file with rotation. Callers only put records
+    on a queue; a background thread does the writing and rotating, so
+    logging never blocks the browser workers on disk I/O. With
+    json_format the file gets one JSON object per line.
     """
+    global _listener
     logger.setLevel(level)
 
     # Prevent duplicate handlers if called multiple times
@@ -34,7 +105,6 @@ def setup_logging(
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
 
     # File handler - logs everything with rotation
     log_path = Path(log_file)
@@ -44,8 +114,26 @@ def setup_logging(
         backupCount=backup_count,
     )
     file_handler.setLevel(logging.DEBUG)
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+    file_handler.setFormatter(JsonFormatter() if json_format else formatter)
+
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = QueueHandler(records)
+    queue_handler.addFilter(_ContextFilter())
+    logger.addHandler(queue_handler)
+
+    _listener = QueueListener(
+        records, console_handler, file_handler, respect_handler_level=True
+    )
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging() -> None:
+    """Write out queued records and stop the logging thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
 
 
 def get_logger(name: str | None = None) -> logging.Logger:
@@ -1,24 +1,48 @@
-from daftlistings import Daft, Location, SearchType, Distance, Listing
-from dotenv import load_dotenv
+from collections.abc import Iterable
+from .daft_api import Listing
+from dotenv import dotenv_values
+from . import metrics
 from .email_notification import EmailNotifier
-from .selenium_bot import DaftBot
-from .cache import load_cache, update_cache, save_images
+from .cache import ListingCache, Status, load_cache, update_cache
+from .images import save_images
+from .ledger import Ledger, close_ledgers, open_ledgers
+from .prefetch import ImagePrefetcher, create_prefetcher
 from .config import load_config, AppConfig
-from .logger import setup_logging, get_logger
+from .config_file import load_profiles
+from .http_cache import PostJson, post_json
+from .replay import Recording, capture_files, replay_polls
+from .search import stream_profiles
+from .logger import setup_logging, get_logger, log_context
 from datetime import datetime
 from time import time
 from pathlib import Path
-import pytz
 import argparse
+import os
 import sys
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # Selenium is only imported when applications are sent
+    from .workers import ApplicationPool
 
 log = get_logger(__name__)
 
+# Listings handed to the apply pool are due again after this many seconds
+# unless a worker reports back first (e.g. the run was killed meanwhile)
+IN_FLIGHT_RETRY = 60
+
 
-def parse_args() -> argparse.Namespace:
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     """Parse command line arguments."""
     parser = argparse.ArgumentParser(description="Automagically apply to daft listings")
 
+    parser.add_argument(
+        "command",
+        nargs="?",
+        choices=["run", "serve"],
+        default="run",
+        help="run: search once and exit (default). serve: poll every profile until stopped",
+    )
     parser.add_argument(
         "--env",
         type=str,
@@ -28,8 +52,16 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--override",
         type=str,
+        nargs="+",
         default=None,
-        help="Path to override environment file (e.g., .2bhk.env)",
+        help="Path to override environment file(s) (e.g., .2bhk.env .3bhk.env)",
+    )
+    parser.add_argument(
+        "--config",
+        type=str,
+        metavar="FILE",
+        default="",
+        help="Read every profile from this TOML file instead of --env/--override",
     )
     parser.add_argument(
         "--noop",
@@ -38,127 +70,404 @@ def parse_args() -> argparse.Namespace:
     )
     parser.add_argument(
         "--fast",
-        action="store_true",
+        action=argparse.BooleanOptionalAction,
         default=True,
-        help="Use cached form values when doing automated replies",
+        help="Fill forms from cached values, and submit enquiries over HTTP with "
+        "the saved session if apply_enquiry_endpoint is set (default: on)",
     )
     parser.add_argument(
         "--visible",
         action="store_true",
         help="Show browser window (for local testing on Mac/Windows)",
     )
+    parser.add_argument(
+        "--profiles",
+        type=str,
+        nargs="+",
+        default=None,
+        help="Profiles to use: names in --config, or in serve mode override files "
+        "(default: every profile in --config, or every .*bhk.env file)",
+    )
+    parser.add_argument(
+        "--interval",
+        type=int,
+        default=300,
+        help="Serve mode: seconds between polls of each profile (default: 300)",
+    )
+    parser.add_argument(
+        "--jitter",
+        type=int,
+        default=30,
+        help="Serve mode: random +/- seconds added to each poll interval (default: 30)",
+    )
+    parser.add_argument(
+        "--search-workers",
+        type=int,
+        default=4,
+        help="Maximum number of Daft searches to run at the same time (default: 4)",
+    )
+    parser.add_argument(
+        "--metrics",
+        type=str,
+        default="",
+        help="Append per-stage timings to this JSON lines file (e.g. metrics.jsonl)",
+    )
+    parser.add_argument(
+        "--prometheus",
+        type=str,
+        default="",
+        help="Write p50/p95 stage timings to this file in Prometheus text format",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=0,
+        help="Serve mode: serve Prometheus metrics on this local port",
+    )
+    parser.add_argument(
+        "--record",
+        type=str,
+        metavar="DIR",
+        default="",
+        help="Save every search response to DIR, one compressed file per poll",
+    )
+    parser.add_argument(
+        "--replay",
+        type=str,
+        metavar="DIR",
+        default="",
+        help="Run mode: re-run each poll recorded in DIR instead of searching Daft",
+    )
+    parser.add_argument(
+        "--log-json",
+        action="store_true",
+        help="Write the log file as JSON lines tagged with run, profile and listing",
+    )
 
-    return parser.parse_args()
+    args = parser.parse_args(argv)
+    if args.replay and (args.record or args.command == "serve"):
+        parser.error("--replay can't be combined with --record or serve")
+    if args.config and args.override:
+        parser.error("--config can't be combined with --override")
+    if args.metrics_port and args.command != "serve":
+        parser.error("--metrics-port only works in serve mode")
+    return args
 
 
-def load_environment(env_file: str, override_file: str | None) -> None:
-    """Load environment variables from files."""
-    env_path = Path(env_file)
-    if not env_path.exists():
-        log.error(f"Environment file not found: {env_path}")
-        sys.exit(1)
+def read_environment(env_file: str, override_file: str | None) -> dict[str, str]:
+    """
+    Read environment files into a dict without touching os.environ.
 
-    load_dotenv(env_path)
+    Layering matches load_dotenv: the base file does not override
+    variables already set in the process, the override file does.
+    """
+    paths = [Path(env_file)] + ([Path(override_file)] if override_file else [])
+    for path in paths:
+        if not path.exists():
+            log.error("Environment file not found: %s", path)
+            sys.exit(1)
 
+    env = {k: v for k, v in dotenv_values(paths[0]).items() if v is not None}
+    env.update(os.environ)
     if override_file:
-        override_path = Path(override_file)
-        if not override_path.exists():
-            log.error(f"Override environment file not found: {override_path}")
-            sys.exit(1)
-        load_dotenv(override_path, override=True)
-        log.info(f"Loaded environment: {env_path.name} + {override_path.name}")
+        env.update({k: v for k, v in dotenv_values(paths[1]).items() if v is not None})
+
+    log.info("Loaded environment: %s", " + ".join(path.name for path in paths))
+    return env
+
+
+def load_config_file(args: argparse.Namespace) -> dict[str, AppConfig]:
+    """The --config profiles selected by --profiles (default: all), by name."""
+    try:
+        configs = load_profiles(args.config)
+    except (OSError, ValueError) as e:
+        log.error("Unable to load %s: %s", args.config, e)
+        sys.exit(1)
+    unknown = [name for name in args.profiles or [] if name not in configs]
+    if unknown:
+        log.error("No profile(s) %s in %s", ", ".join(unknown), args.config)
+        sys.exit(1)
+    log.info("Loaded %s profile(s) from %s", len(configs), args.config)
+    if args.profiles:
+        return {name: configs[name] for name in args.profiles}
+    return configs
+
+
+def get_new_listings(
+    listings: Iterable[Listing], cache: ListingCache, applying: bool = False
+) -> list[Listing]:
+    """
+    Return listings not in cache, marking them as seen.
+
+    Listings about to be applied to are marked retry-after instead, so
+    they are found again if the run ends before the pool reports back.
+    """
+    if applying:
+        status, retry_after = Status.RETRY_AFTER, time() + IN_FLIGHT_RETRY
     else:
-        log.info(f"Loaded environment: {env_path.name}")
-
-
-def create_daft_search(config: AppConfig) -> Daft:
-    """Create Daft search with configured filters."""
-    daft = Daft()
-    daft.set_location(
-        [
-            Location.RANELAGH_DUBLIN,
-            Location.BALLSBRIDGE_DUBLIN,
-            Location.DUBLIN_4_DUBLIN,
-            Location.DUBLIN_2_DUBLIN,
-            Location.DONNYBROOK_DUBLIN,
-            Location.RATHMINES_DUBLIN,
-            Location.GRAND_CANAL_DOCK_DUBLIN,
-        ],
-        Distance.KM1,
-    )
-    daft.set_min_beds(config.daft_search.min_beds)
-    daft.set_max_beds(config.daft_search.max_beds)
-    daft.set_min_baths(config.daft_search.min_baths)
-    daft.set_search_type(SearchType.RESIDENTIAL_RENT)
-    daft.set_max_price(config.daft_search.max_price)
-    return daft
-
-
-def get_new_listings(daft: Daft, cache: dict[str, str]) -> list[Listing]:
-    """Search listings and return ones not in cache."""
+        status, retry_after = Status.SEEN, None
     new_listings = []
-    for listing in daft.search():
+    for listing in listings:
         if listing.daft_link not in cache:
             new_listings.append(listing)
-            cache[listing.daft_link] = ""
-    log.info(f"{len(new_listings)} new listing(s) found")
+            cache.mark(listing.daft_link, status, retry_after)
     return new_listings
 
 
+def claim_listings(
+    ledger: Ledger, owner: str, listings: list[Listing], read_only: bool = False
+) -> list[Listing]:
+    """
+    Return the listings this profile owns, claiming unowned ones.
+
+    With read_only (profiles that don't apply), unowned listings are
+    returned without claiming them, so a notify-only profile never keeps
+    a listing from the profile that would apply to it.
+    """
+    if read_only:
+        claimed = [l for l in listings if ledger.owner(l.daft_link) in (None, owner)]
+    else:
+        claimed = [l for l in listings if ledger.claim(l.daft_link, owner)]
+    skipped = len(listings) - len(claimed)
+    if skipped:
+        log.info("%s listing(s) already handled by another profile", skipped)
+    return claimed
+
+
 def log_current_time() -> None:
     """Log current time in Irish timezone."""
+    import pytz
+
     current_time = datetime.now(pytz.timezone("Europe/Dublin"))
-    log.info(f"Current time (Dublin): {current_time.strftime('%Y-%m-%d %H:%M:%S')}")
+    log.info("Current time (Dublin): %s", current_time.strftime("%Y-%m-%d %H:%M:%S"))
 
 
-def main() -> None:
-    args = parse_args()
+def run_cycle(
+    config: AppConfig,
+    cache: ListingCache,
+    email_notifier: EmailNotifier,
+    pool: "ApplicationPool | None",
+    use_cached_values: bool = True,
+    prefetcher: ImagePrefetcher | None = None,
+    ledger: Ledger | None = None,
+    post: PostJson = post_json,
+) -> list[Listing]:
+    """Search, notify and apply once. Pass pool=None to skip applications."""
+    stream = stream_profiles([config.daft_search], [cache], post=post)
+    new_listings = process_stream(
+        stream,
+        [config],
+        [cache],
+        [email_notifier],
+        [pool],
+        use_cached_values,
+        prefetchers=[prefetcher],
+        ledgers=[ledger],
+    )[0]
+    if prefetcher is not None:
+        prefetcher.flush()
+    return new_listings
+
+
+def process_stream(
+    stream: Iterable[tuple[int, list[Listing]]],
+    configs: list[AppConfig],
+    caches: list[ListingCache],
+    email_notifiers: list[EmailNotifier],
+    pools: "list[ApplicationPool | None]",
+    use_cached_values: bool = True,
+    prefetchers: list[ImagePrefetcher | None] | None = None,
+    ledgers: list[Ledger | None] | None = None,
+) -> list[list[Listing]]:
+    """
+    Notify about and apply to new listings as the search finds them.
+
+    Each page from stream_profiles is checked against its profile's cache
+    straight away: new listings are handed to the apply pool first, then
+    queued for the email notifier (delivered in the background) and the
+    image prefetchers, so the first application doesn't wait for the
+    search to finish. Until the pool reports back they are cached as
+    retry-after (see get_new_listings); without a pool (noop) they are
+    marked as seen. With a ledger, listings another profile has already
+    claimed are only marked as seen; profiles without a pool check the
+    ledger but claim nothing.
+    Returns the new listings of each profile.
+    """
+    prefetchers = prefetchers or [None] * len(caches)
+    ledgers = ledgers or [None] * len(caches)
+    owners = [str(Path(c.daft_search.cache_file).resolve()) for c in configs]
+    for cache, pool in zip(caches, pools):
+        if pool is not None:
+            pool.begin(cache, use_cached_values=use_cached_values)
+        else:
+            log.info("Noop mode: skipping automated responses")
+
+    new_listings: list[list[Listing]] = [[] for _ in caches]
+    try:
+        for index, page in stream:
+            with log_context(profile=configs[index].profile):
+                applying = pools[index] is not None
+                new_page = get_new_listings(page, caches[index], applying)
+                if ledgers[index] is not None:
+                    claimed = claim_listings(
+                        ledgers[index],
+                        owners[index],
+                        new_page,
+                        read_only=not applying,
+                    )
+                    if applying and len(claimed) < len(new_page):
+                        for listing in set(new_page) - set(claimed):
+                            caches[index].mark(listing.daft_link, Status.SEEN)
+                    new_page = claimed
+                if not new_page:
+                    continue
+                for listing in new_page:
+                    log.debug("New listing: %s", listing.daft_link)
+                if applying:
+                    for listing in new_page:
+                        pools[index].submit(listing)
+                with metrics.span("notify"):
+                    email_notifiers[index].notify(new_page)
+                if prefetchers[index] is not None:
+                    prefetchers[index].submit(new_page)
+                new_listings[index].extend(new_page)
+    finally:
+        # Wait for applications, then queue the digest of failed ones
+        for pool, email_notifier in zip(pools, email_notifiers):
+            if pool is not None:
+                pool.finish()
+            email_notifier.flush()
+
+    # Save state
+    for config, cache, listings in zip(configs, caches, new_listings):
+        log.info("%s new listing(s) found", len(listings))
+        update_cache(cache)
+        save_images(listings, config.daft_search.images_db)
+    return new_listings
+
 
-    # Derive log file name from override file (e.g., .2bhk.env -> daft_bot_2bhk.log)
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    if args.metrics or args.prometheus or args.metrics_port:
+        metrics.configure(args.metrics, args.prometheus, args.metrics_port)
+
+    if args.command == "serve":
+        from .daemon import serve
+
+        setup_logging(log_file="daft_bot_serve.log", json_format=args.log_json)
+        serve(args)
+        return
+
+    # Derive log file name from override files (e.g., .2bhk.env -> daft_bot_2bhk.log)
     if args.override:
-        override_name = Path(args.override).stem.lstrip(".")  # ".2bhk" -> "2bhk"
+        # ".2bhk" -> "2bhk", several files -> "2bhk_3bhk"
+        override_name = "_".join(Path(o).stem.lstrip(".") for o in args.override)
+        log_file = f"daft_bot_{override_name}.log"
+    elif args.config and args.profiles:
+        override_name = "_".join(args.profiles)
+        log_file = f"daft_bot_{override_name}.log"
+    elif args.config:
+        override_name = Path(args.config).stem
         log_file = f"daft_bot_{override_name}.log"
     else:
+        override_name = "default"
         log_file = "daft_bot.log"
 
     # Setup logging first
-    setup_logging(log_file=log_file)
+    setup_logging(log_file=log_file, json_format=args.log_json)
     log.info("===== DAFT BOT STARTED =====")
 
     start_time = time()
 
     # Setup
-    load_environment(args.env, args.override)
-    config = load_config()
+    with metrics.span("config_load"):
+        if args.config:
+            configs = list(load_config_file(args).values())
+        else:
+            configs = [
+                load_config(read_environment(args.env, override_file))
+                for override_file in (args.override or [None])
+            ]
     log_current_time()
 
-    # Search for new listings
-    cache = load_cache(config.daft_search.cache_file)
-    new_listings = get_new_listings(create_daft_search(config), cache)
+    # Search all profiles at once
+    with metrics.span("cache_load"):
+        caches = [
+            load_cache(
+                config.daft_search.cache_file, bloom=config.daft_search.cache_bloom
+            )
+            for config in configs
+        ]
 
-    for listing in new_listings:
-        log.debug(f"New listing: {listing.daft_link}")
+    if args.replay and not capture_files(args.replay):
+        log.error("No recorded polls in %s", args.replay)
+        sys.exit(1)
 
-    # Notify and apply
-    email_notifier = EmailNotifier(config.email)
-    email_notifier.notify(new_listings)
+    # Notify and apply per profile while the searches are still running
+    notifiers = [EmailNotifier(config.email) for config in configs]
+    pools: list[ApplicationPool | None] = [None] * len(configs)
+    prefetchers: list[ImagePrefetcher | None] = []
+    ledgers: list[Ledger | None] = []
+    recording = None
+    try:
+        if not args.noop:
+            from .workers import ApplicationPool
 
-    if not args.noop:
-        bot = DaftBot(
-            config=config,
-            email_notifier=email_notifier,
-            headless=not args.visible,
-        )
-        bot.process_listings(new_listings, cache, use_cached_values=args.fast)
-    else:
-        log.info("Noop mode: skipping automated responses")
+            pools = [
+                ApplicationPool(
+                    config=config,
+                    email_notifier=email_notifier,
+                    headless=not args.visible,
+                )
+                for config, email_notifier in zip(configs, notifiers)
+            ]
+        prefetchers = [create_prefetcher(config) for config in configs]
+        ledgers = open_ledgers(configs)
 
-    # Save state
-    update_cache(cache, config.daft_search.cache_file)
-    save_images(new_listings)
+        # Search Daft once, or run every recorded poll in turn
+        if args.record:
+            recording = Recording(args.record, override_name)
+        if args.replay:
+            log.info("Replaying %s recorded poll(s)", len(capture_files(args.replay)))
+            posts = (replay.post for replay in replay_polls(args.replay))
+        else:
+            posts = [recording.post if recording else post_json]
+        for post in posts:
+            stream = stream_profiles(
+                [config.daft_search for config in configs],
+                caches,
+                max_workers=args.search_workers,
+                post=post,
+            )
+            process_stream(
+                stream,
+                configs,
+                caches,
+                notifiers,
+                pools,
+                use_cached_values=args.fast,
+                prefetchers=prefetchers,
+                ledgers=ledgers,
+            )
+    finally:
+        # Also on errors: close browsers and the HTTP session, then wait for
+        # queued emails and image downloads before exiting
+        if recording is not None:
+            recording.close()
+        for pool in pools:
+            if pool is not None:
+                pool.close()
+        close_ledgers(ledgers)
+        for email_notifier in notifiers:
+            email_notifier.close()
+        for prefetcher in prefetchers:
+            if prefetcher is not None:
+                prefetcher.close()
 
     elapsed = round(time() - start_time, 2)
-    log.info(f"Completed in {elapsed} seconds")
+    metrics.record("run", elapsed)
+    metrics.export()
+    log.info("Completed in %s seconds", elapsed)
     log.info("===== DAFT BOT FINISHED =====")
 
 
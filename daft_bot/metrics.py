@@ -0,0 +1,239 @@
+"""
+Timing spans for each stage of a run, exported as JSON lines/Prometheus.
+
+Usage:
+    metrics.configure(jsonl_path="metrics.jsonl", prometheus_path="metrics.prom")
+    with metrics.span("search_page"):
+        ...
+    metrics.export()  # end of run / poll
+
+    python -m daft_bot.metrics metrics.jsonl   # p50/p95 per span across runs
+
+Every span becomes one JSON line tagged with the run ID, so runs can be
+compared and a slow cycle traced to Daft, SMTP or Chrome. The Prometheus
+text (written to a file or served on a port) summarises the span history
+with p50/p95 quantiles, and counts and sums every span since the process
+started. The history is read from the JSONL file once, by configure(),
+and kept up to date in memory. Nothing is recorded until configure() is
+called.
+"""
+
+import argparse
+import json
+import threading
+from collections import deque
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from time import perf_counter, time
+
+from .logger import RUN_ID, get_logger
+
+log = get_logger(__name__)
+
+HISTORY_PER_SPAN = 1000  # samples per span used for quantiles
+
+_enabled = False
+_jsonl_path = ""
+_prometheus_path = ""
+_events: list[dict] = []  # recorded since the last export()
+_totals: dict[str, list] = {}  # span -> [count, seconds] since the process started
+_recent: dict[str, deque] = {}  # span -> its last HISTORY_PER_SPAN events
+_lock = threading.Lock()
+
+
+def configure(
+    jsonl_path: str = "", prometheus_path: str = "", port: int = 0
+) -> None:
+    """Start recording spans and choose where export() writes them."""
+    global _enabled, _jsonl_path, _prometheus_path
+    _jsonl_path = jsonl_path
+    _prometheus_path = prometheus_path
+    if jsonl_path:
+        # Quantiles carry on from earlier runs
+        with _lock:
+            for event in load_history(jsonl_path):
+                _recent.setdefault(
+                    event.get("span"), deque(maxlen=HISTORY_PER_SPAN)
+                ).append(event)
+    _enabled = True
+    if port:
+        _serve_prometheus(port)
+
+
+def record(name: str, seconds: float, ok: bool = True, **labels) -> None:
+    """Record one already-measured span."""
+    if not _enabled:
+        return
+    event = {
+        "ts": round(time(), 3),
+        "run": RUN_ID,
+        "span": name,
+        "seconds": round(seconds, 4),
+        "ok": ok,
+        **labels,
+    }
+    with _lock:
+        _events.append(event)
+        totals = _totals.setdefault(name, [0, 0.0])
+        totals[0] += 1
+        totals[1] += seconds
+        _recent.setdefault(name, deque(maxlen=HISTORY_PER_SPAN)).append(event)
+
+
+@contextmanager
+def span(name: str, **labels) -> Iterator[None]:
+    """Time the enclosed block; ok=False if it raised."""
+    start = perf_counter()
+    ok = True
+    try:
+        yield
+    except BaseException:
+        ok = False
+        raise
+    finally:
+        record(name, perf_counter() - start, ok=ok, **labels)
+
+
+def _take() -> list[dict]:
+    global _events
+    with _lock:
+        events, _events = _events, []
+    return events
+
+
+def export() -> None:
+    """Append recorded spans to the JSONL file and refresh the Prometheus file."""
+    events = _take()
+    if _jsonl_path and events:
+        try:
+            with open(_jsonl_path, "a") as f:
+                f.writelines(json.dumps(event) + "\n" for event in events)
+        except OSError as e:
+            log.error("Unable to write metrics: %s", e)
+    if _prometheus_path:
+        text = _exposition()
+        tmp_path = Path(_prometheus_path + ".tmp")
+        try:
+            tmp_path.write_text(text)
+            tmp_path.replace(_prometheus_path)
+        except OSError as e:
+            log.error("Unable to write Prometheus metrics: %s", e)
+
+
+def load_history(path: str) -> list[dict]:
+    """The last HISTORY_PER_SPAN samples of every span in a JSONL file."""
+    samples: dict[str, deque] = {}
+    try:
+        with open(path, "r") as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                span_name = event.get("span")
+                samples.setdefault(span_name, deque(maxlen=HISTORY_PER_SPAN))
+                samples[span_name].append(event)
+    except FileNotFoundError:
+        return []
+    return [event for events in samples.values() for event in events]
+
+
+def _quantile(values: list[float], q: float) -> float:
+    # Nearest rank, as in benchmarks/harness.py
+    return values[min(len(values) - 1, round(q * (len(values) - 1)))]
+
+
+def summarize(events: Iterable[dict]) -> dict[str, dict[str, float]]:
+    """Count, sum, p50 and p95 of span durations, per span name."""
+    durations: dict[str, list[float]] = {}
+    for event in events:
+        durations.setdefault(event["span"], []).append(event["seconds"])
+
+    summary = {}
+    for name, values in sorted(durations.items()):
+        values.sort()
+        summary[name] = {
+            "count": len(values),
+            "sum": sum(values),
+            "p50": _quantile(values, 0.5),
+            "p95": _quantile(values, 0.95),
+        }
+    return summary
+
+
+def prometheus_text(summary: dict[str, dict[str, float]]) -> str:
+    """Render a summary in the Prometheus text exposition format."""
+    lines = [
+        "# HELP daft_bot_span_seconds Time spent in each stage of a run.",
+        "# TYPE daft_bot_span_seconds summary",
+    ]
+    for name, stats in summary.items():
+        metric = f'daft_bot_span_seconds{{span="{name}"'
+        lines.append(f'{metric},quantile="0.5"}} {stats["p50"]}')
+        lines.append(f'{metric},quantile="0.95"}} {stats["p95"]}')
+        lines.append(f'daft_bot_span_seconds_sum{{span="{name}"}} {stats["sum"]:.4f}')
+        lines.append(f'daft_bot_span_seconds_count{{span="{name}"}} {stats["count"]}')
+    return "\n".join(lines) + "\n"
+
+
+def _exposition() -> str:
+    """
+    Prometheus text for this process.
+
+    Quantiles cover the last HISTORY_PER_SPAN samples of each span,
+    including earlier runs' from the JSONL file. _count and _sum are
+    totals since the process started, so they never go down between
+    scrapes the way a windowed history would.
+    """
+    with _lock:
+        recent = [event for events in _recent.values() for event in events]
+        totals = {name: tuple(total) for name, total in _totals.items()}
+    summary = summarize(recent)
+    for name, (count, seconds) in totals.items():
+        if name in summary:
+            summary[name]["count"] = count
+            summary[name]["sum"] = seconds
+    return prometheus_text(summary)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        body = _exposition().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def _serve_prometheus(port: int) -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", port), _MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, name="metrics", daemon=True)
+    thread.start()
+    log.info("Serving metrics on http://127.0.0.1:%s/metrics", port)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Summarise recorded span timings")
+    parser.add_argument("jsonl", nargs="?", default="metrics.jsonl")
+    parser.add_argument("--run", default=None, help="only this run ID")
+    args = parser.parse_args()
+
+    events = load_history(args.jsonl)
+    if args.run:
+        events = [event for event in events if event.get("run") == args.run]
+    print(f"{'span':<16} {'count':>6} {'p50':>8} {'p95':>8}")
+    for name, stats in summarize(events).items():
+        print(
+            f"{name:<16} {stats['count']:>6} "
+            f"{stats['p50']:>7.3f}s {stats['p95']:>7.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+"""
+Search and email only: the fast entry point for cron.
+
+Usage:
+    daft-bot-notify --override .2bhk.env    # same options as daft-bot --noop
+
+Never imports Selenium or the worker pool, and reads Daft's search API
+without importing daftlistings, so a cron run starts in a fraction of
+the time the full bot takes. New listings are cached and emailed as
+usual; nothing is applied to.
+"""
+
+import sys
+
+from .main import main as _main
+
+
+def main(argv: list[str] | None = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    _main([*argv, "--noop"] if "--noop" not in argv else argv)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Disk-backed outbox for email notifications.
+
+Every message is written to its own file before delivery is attempted
+and removed only once the SMTP server has accepted it, so notifications
+queued when the process crashes (or the mail server is down) are sent on
+the next start.
+"""
+
+import os
+import uuid
+from pathlib import Path
+from time import time_ns
+
+from .logger import get_logger
+
+log = get_logger(__name__)
+
+
+class Outbox:
+    """Directory of pending messages, one file each, oldest first."""
+
+    SUFFIX = ".eml"
+
+    def __init__(self, directory: str) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def put(self, message: str) -> Path:
+        """Durably store a message and return its path."""
+        # Time first so that sorting file names gives delivery order
+        name = f"{time_ns()}-{uuid.uuid4().hex}"
+        path = self.directory / f"{name}{self.SUFFIX}"
+        tmp_path = self.directory / f"{name}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(message)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        return path
+
+    def pending(self) -> list[Path]:
+        """All messages not yet delivered, oldest first."""
+        return sorted(self.directory.glob(f"*{self.SUFFIX}"))
+
+    def read(self, path: Path) -> str | None:
+        """Message contents, or None if it has already been delivered."""
+        try:
+            return path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+    def remove(self, path: Path) -> None:
+        """Drop a delivered message."""
+        path.unlink(missing_ok=True)
@@ -0,0 +1,168 @@
+"""
+Background image prefetcher with a content-addressed local cache.
+
+Usage:
+    prefetcher = create_prefetcher(config)  # None unless image_cache_dir is set
+    prefetcher.submit(listings)
+    prefetcher.flush()  # wait, record and evict; repeat per poll
+    prefetcher.close()
+
+Listing images are downloaded on a small thread pool, each thread with
+its own keep-alive session, while the bot carries on applying. Files
+are stored under their SHA-256 (objects/ab/abcdef...) so a photo reused
+across listings is kept once, and the URL -> hash mapping goes into the
+image manifest. When the cache grows past its size budget the least
+recently used files are deleted.
+"""
+
+import hashlib
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import requests
+from requests.adapters import HTTPAdapter
+
+if TYPE_CHECKING:
+    from daftlistings import Listing
+
+from .config import AppConfig, ImageConfig
+from .images import ImageManifest
+from .logger import get_logger
+
+log = get_logger(__name__)
+
+
+class ImagePrefetcher:
+    """Download listing images in the background into a content-addressed cache."""
+
+    CHUNK_SIZE = 64 * 1024
+    TIMEOUT = 30  # seconds
+
+    def __init__(self, config: ImageConfig, images_db: str) -> None:
+        self.config = config
+        self.directory = Path(config.cache_dir)
+        (self.directory / "tmp").mkdir(parents=True, exist_ok=True)
+        self.max_bytes = config.cache_size_mb * 1024 * 1024
+        # Only used from the thread calling submit(), flush() and close()
+        self._manifest = ImageManifest(images_db)
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(1, config.workers), thread_name_prefix="image-prefetch"
+        )
+        self._local = threading.local()
+        self._futures: list[Future] = []
+        self._queued: set[str] = set()
+
+    def blob_path(self, digest: str) -> Path:
+        return self.directory / "objects" / digest[:2] / digest
+
+    def path_for(self, url: str) -> Path | None:
+        """Local copy of an image, if it was prefetched and not evicted."""
+        digest = self._manifest.digest_for(url)
+        if digest is None:
+            return None
+        path = self.blob_path(digest)
+        return path if path.exists() else None
+
+    def submit(self, listings: list["Listing"]) -> None:
+        """Queue the listings' images for download. Returns immediately."""
+        for listing in listings:
+            try:
+                images = listing.images
+            except KeyError:
+                continue
+            for image in images:
+                url = image.get(self.config.size)
+                if not url or url in self._queued or self.path_for(url):
+                    continue
+                self._queued.add(url)
+                self._futures.append(self._pool.submit(self._fetch, url))
+
+    def flush(self) -> None:
+        """Wait for downloads, record them in the manifest and enforce the budget."""
+        wait(self._futures)
+        downloads = [f.result() for f in self._futures if f.result() is not None]
+        self._futures, self._queued = [], set()
+        if downloads:
+            self._manifest.record_downloads(downloads)
+            log.info("Prefetched %s image(s)", len(downloads))
+        self.evict()
+
+    def close(self) -> None:
+        """Flush, then stop the download threads."""
+        self.flush()
+        self._pool.shutdown()
+        self._manifest.close()
+
+    def evict(self) -> None:
+        """Delete least recently used files until the cache fits its budget."""
+        blobs = []
+        total = 0
+        for path in (self.directory / "objects").glob("*/*"):
+            stat = path.stat()
+            blobs.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        if total <= self.max_bytes:
+            return
+
+        blobs.sort()
+        evicted = 0
+        for _, size, path in blobs:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            evicted += 1
+        log.info("Evicted %s cached image(s)", evicted)
+
+    def _session(self) -> requests.Session:
+        # requests.Session isn't thread-safe, so each worker keeps its own
+        if not hasattr(self._local, "session"):
+            session = requests.Session()
+            session.mount("https://", HTTPAdapter(pool_maxsize=1))
+            session.mount("http://", HTTPAdapter(pool_maxsize=1))
+            self._local.session = session
+        return self._local.session
+
+    def _fetch(self, url: str) -> tuple[str, str, int] | None:
+        """Download one image. Returns (url, sha256, bytes) or None on failure."""
+        tmp_path = self.directory / "tmp" / f"{os.getpid()}.{threading.get_ident()}"
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            response = self._session().get(url, stream=True, timeout=self.TIMEOUT)
+            with response:
+                response.raise_for_status()
+                with open(tmp_path, "wb") as f:
+                    for chunk in response.iter_content(self.CHUNK_SIZE):
+                        digest.update(chunk)
+                        f.write(chunk)
+                        size += len(chunk)
+        except (requests.RequestException, OSError) as e:
+            log.warning("Unable to prefetch %s: %s", url, e)
+            tmp_path.unlink(missing_ok=True)
+            return None
+
+        path = self.blob_path(digest.hexdigest())
+        try:
+            if path.exists():
+                # Same photo already stored; mark it as recently used
+                tmp_path.unlink()
+                os.utime(path)
+            else:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(tmp_path, path)
+        except OSError as e:
+            log.warning("Unable to store %s: %s", url, e)
+            tmp_path.unlink(missing_ok=True)
+            return None
+        return url, digest.hexdigest(), size
+
+
+def create_prefetcher(config: AppConfig) -> ImagePrefetcher | None:
+    """Prefetcher for a profile, or None when image_cache_dir isn't set."""
+    if not config.images.cache_dir:
+        return None
+    return ImagePrefetcher(config.images, config.daft_search.images_db)
@@ -0,0 +1,115 @@
+"""
+Apply-order scoring and the priority queue application workers share.
+
+Usage:
+    score = compile_score(config.apply, config.daft_search.max_price)
+    queue = ListingQueue(score, limit=config.apply.max_per_run)
+
+When more listings are waiting than workers can take, the best scored
+go first: newer, cheaper relative to the profile's max price, in a
+preferred area, or advertised by an agent given a positive weight.
+"""
+
+import heapq
+import itertools
+import re
+from collections.abc import Callable
+from queue import Queue
+from time import time
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from daftlistings import Listing
+
+from .config import ApplyConfig
+from .daft_api import monthly_price
+
+
+def compile_score(config: ApplyConfig, max_price: int) -> Callable[["Listing"], float]:
+    """
+    Build the scoring function for a profile; higher scores apply first.
+
+    Each term is scaled to 0..1 before weighting: freshness halves every
+    freshness_half_life hours, price is how far below max_price the rent
+    is, and location is 1 when the title names a preferred area. Agent
+    weights are added as they are.
+    """
+    half_life_ms = config.freshness_half_life * 3600 * 1000
+    locations = None
+    if config.preferred_locations:
+        locations = re.compile(
+            "|".join(re.escape(l) for l in config.preferred_locations), re.IGNORECASE
+        )
+    agents = {name.lower(): weight for name, weight in config.agent_weights.items()}
+
+    def score(listing: "Listing") -> float:
+        result = listing.as_dict()
+        total = 0.0
+
+        published = result.get("publishDate")
+        if config.weight_freshness and published and half_life_ms:
+            age = max(0.0, time() * 1000 - published)
+            total += config.weight_freshness * 0.5 ** (age / half_life_ms)
+
+        price = monthly_price(result)
+        if config.weight_price and price is not None and max_price:
+            total += config.weight_price * max(0.0, 1 - price / max_price)
+
+        if locations is not None and locations.search(result.get("title") or ""):
+            total += config.weight_location
+
+        if agents:
+            seller = (result.get("seller") or {}).get("name") or ""
+            total += agents.get(seller.lower(), 0.0)
+
+        return total
+
+    return score
+
+
+class ListingQueue(Queue):
+    """
+    Thread-safe priority queue of listings, best score first.
+
+    None (a worker's stop signal) sorts after every listing. With a limit,
+    only that many listings are handed out; after that get() returns None
+    and the rest stay queued for the caller to deal with.
+    """
+
+    def __init__(
+        self, score: Callable[["Listing"], float] | None = None, limit: int = 0
+    ) -> None:
+        self.score = score or (lambda listing: 0.0)
+        self.limit = limit
+        self.handed_out = 0
+        super().__init__()
+
+    def _init(self, maxsize: int) -> None:
+        self.queue: list = []
+        self._order = itertools.count()
+
+    def _qsize(self) -> int:
+        return len(self.queue)
+
+    def _put(self, listing: "Listing | None") -> None:
+        # Ties keep arrival order
+        if listing is None:
+            key = (1, 0.0, next(self._order))
+        else:
+            key = (0, -self.score(listing), next(self._order))
+        heapq.heappush(self.queue, (key, listing))
+
+    def _get(self) -> "Listing | None":
+        if self.limit and self.handed_out >= self.limit:
+            return None
+        _, listing = heapq.heappop(self.queue)
+        if listing is not None:
+            self.handed_out += 1
+        return listing
+
+    def remaining(self) -> list["Listing"]:
+        """Take every listing still queued, ignoring the limit."""
+        with self.mutex:
+            listings = [listing for _, listing in self.queue if listing is not None]
+            self.queue.clear()
+            return listings
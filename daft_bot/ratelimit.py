@@ -0,0 +1,47 @@
+import threading
+from time import monotonic, sleep
+from urllib.parse import urlparse
+
+
+class RateLimiter:
+    """
+    Keep requests to the same host at least min_interval seconds apart.
+
+    Thread-safe: each caller reserves the next free slot for its host and
+    sleeps until then outside the lock.
+    """
+
+    def __init__(self, min_interval: float) -> None:
+        self.min_interval = min_interval
+        self._next_slot: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url: str) -> None:
+        """Block until a request to url's host is allowed."""
+        host = urlparse(url).hostname or url
+        with self._lock:
+            now = monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.min_interval
+        if slot > now:
+            sleep(slot - now)
+
+
+_shared: RateLimiter | None = None
+_shared_lock = threading.Lock()
+
+
+def shared_rate_limiter(min_interval: float) -> RateLimiter:
+    """
+    The process-wide limiter for requests to daft.ie.
+
+    Every profile's pool talks to the same hosts, so they share one
+    limiter; with different intervals configured the longest applies.
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = RateLimiter(min_interval)
+        else:
+            _shared.min_interval = max(_shared.min_interval, min_interval)
+        return _shared
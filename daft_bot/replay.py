@@ -0,0 +1,136 @@
+"""
+Record Daft search traffic and replay it without the network.
+
+Usage:
+    daft-bot --record captures/          # search as usual, saving every page
+    daft-bot --replay captures/ --noop   # re-run each captured poll offline
+
+Every poll is saved as one gzip-compressed JSON lines file
+(<time_ns>-<profile>.jsonl.gz), a line per search request: the payload,
+Daft's raw response, whether it was unchanged since the response cache's
+copy, and the listing dicts it produced. Replaying serves the responses
+back through the same search code, so matching, filters, the cache,
+notifications and applications run on real historical traffic at full
+speed. captured_pages() reads the listings alone, for benchmarks.
+"""
+
+import gzip
+import json
+import threading
+import zlib
+from collections.abc import Iterator
+from pathlib import Path
+from time import time_ns
+
+import requests
+from .daft_api import Listing
+
+from .http_cache import ResponseCache, post_json
+from .logger import get_logger
+from .search import page_listings
+
+log = get_logger(__name__)
+
+_EMPTY_PAGE = {"listings": [], "paging": {"totalResults": 0}}
+
+
+def _key(payload: dict) -> str:
+    return json.dumps(payload, sort_keys=True, separators=(",", ":"))
+
+
+class Recording:
+    """One poll's search responses, written as they arrive."""
+
+    def __init__(self, directory: str, name: str = "default") -> None:
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        self.path = Path(directory) / f"{time_ns()}-{name}.jsonl.gz"
+        self.pages = 0
+        self._file = gzip.open(self.path, "wt", encoding="utf-8")
+        self._lock = threading.Lock()  # Searches run on several threads
+
+    def post(
+        self,
+        session: requests.Session,
+        url: str,
+        headers: dict,
+        payload: dict,
+        cache: ResponseCache | None = None,
+        timeout: int = 30,
+    ) -> tuple[dict, bool]:
+        """post_json, saving the request and its response."""
+        data, unchanged = post_json(session, url, headers, payload, cache, timeout)
+        entry = {
+            "payload": payload,
+            "response": data,
+            "unchanged": unchanged,
+            "listings": [listing.as_dict() for listing in page_listings(data)],
+        }
+        line = json.dumps(entry) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self.pages += 1
+        return data, unchanged
+
+    def close(self) -> None:
+        self._file.close()
+        log.info("Recorded %s search page(s) to %s", self.pages, self.path)
+
+
+def read_capture(path: Path) -> Iterator[dict]:
+    """Entries of one capture file; a torn last line from a crash is skipped."""
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    log.warning("Skipping unreadable line in %s", path.name)
+    except (EOFError, zlib.error, gzip.BadGzipFile) as e:
+        log.warning("Capture %s is truncated: %s", path.name, e)
+
+
+class Replay:
+    """One recorded poll, answering search requests in place of Daft."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.missed = 0
+        self._responses = {_key(e["payload"]): e for e in read_capture(path)}
+
+    def post(
+        self,
+        session: requests.Session,
+        url: str,
+        headers: dict,
+        payload: dict,
+        cache: ResponseCache | None = None,
+        timeout: int = 30,
+    ) -> tuple[dict, bool]:
+        """The recorded response to the same payload, or an empty page."""
+        entry = self._responses.get(_key(payload))
+        if entry is None:
+            # Another profile's poll, or the search went further than recorded
+            self.missed += 1
+            return _EMPTY_PAGE, False
+        return entry["response"], entry["unchanged"]
+
+
+def capture_files(directory: str) -> list[Path]:
+    """Capture files in recording order."""
+    return sorted(Path(directory).glob("*.jsonl.gz"))
+
+
+def replay_polls(directory: str) -> Iterator[Replay]:
+    """Load captured polls one at a time, oldest first."""
+    for path in capture_files(directory):
+        replay = Replay(path)
+        yield replay
+        if replay.missed:
+            log.debug("%s request(s) not in %s", replay.missed, path.name)
+
+
+def captured_pages(directory: str) -> Iterator[list[Listing]]:
+    """The listings of every recorded page, without going through the search."""
+    for path in capture_files(directory):
+        for entry in read_capture(path):
+            yield [Listing({"listing": result}) for result in entry["listings"]]
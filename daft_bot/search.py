@@ -0,0 +1,435 @@
+"""
+Daft search helpers shared by every profile.
+
+Profiles whose searches only differ in beds/baths are merged into one
+query per location/price band, run concurrently, and the results are
+matched back to each profile locally, together with the profile's
+filter_* rules (see filters.py). stream_profiles yields them page by
+page so callers can act on a listing before the search has finished.
+
+Profiles with search_stop_after_seen set search incrementally: results
+are sorted newest first and fetched a page at a time, stopping once that
+many listings in a row are already cached, unless cached listings due
+for a retry have not turned up yet. That is bounded: only retries from
+the last RETRY_MAX_AGE seconds count, at most RETRY_MAX_PAGES extra pages
+are fetched for them, and a listing missing from RETRY_MAX_MISSED
+searches in a row is no longer looked for.
+
+Pages are requested through http_cache.post_json on a keep-alive session,
+so with search_cache_dir set an unchanged page costs a 304 round-trip.
+"""
+
+import threading
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+from dataclasses import dataclass
+from queue import Queue
+
+import requests
+
+from .cache import (
+    ListingCache,
+    listing_id,
+    load_high_water_mark,
+    save_high_water_mark,
+)
+from .config import DaftSearchConfig
+from .daft_api import (
+    ENDPOINT,
+    HEADERS,
+    PAGE_SIZE,
+    PUBLISH_DATE_DESC,
+    Listing,
+    first_number,
+    monthly_price,
+    search_payload,
+)
+from .filters import compile_filters
+from . import metrics
+from .http_cache import PostJson, ResponseCache, post_json
+from .logger import get_logger
+
+log = get_logger(__name__)
+
+RETRY_MAX_AGE = 3 * 24 * 3600  # seconds since a listing last failed
+RETRY_MAX_PAGES = 3  # pages fetched past the usual stop for retries
+RETRY_MAX_MISSED = 3  # searches in a row a retry may be missing from
+
+# One keep-alive session per search thread (requests.Session isn't thread-safe)
+_local = threading.local()
+
+
+def _session() -> requests.Session:
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+    return _local.session
+
+
+@dataclass(frozen=True)
+class SearchQuery:
+    """Server-side filters of one Daft search. Equal queries are sent once."""
+
+    locations: tuple[str, ...]
+    distance: str
+    max_price: int
+    min_beds: int
+    max_beds: int
+    min_baths: int
+
+
+def create_daft_search(query: SearchQuery) -> dict:
+    """Payload of a Daft search with the given filters."""
+    return search_payload(
+        query.locations,
+        query.distance,
+        min_beds=query.min_beds,
+        max_beds=query.max_beds,
+        min_baths=query.min_baths,
+        max_price=query.max_price,
+    )
+
+
+def _expand(result: dict) -> list[dict]:
+    """
+    Split grouped developments into one result per unit.
+
+    Mirrors what Daft.search() does with the raw results.
+    """
+    listing = result["listing"]
+    # newHome searches carry the unit list under 'newHome' instead of 'prs'
+    if "subUnits" in listing.get("newHome", {}):
+        listing["prs"] = listing.pop("newHome")
+
+    sub_units = listing.get("prs", {}).get("subUnits")
+    if not sub_units:
+        if listing.get("propertyType") == "Studio":
+            listing["numBedrooms"] = "1 bed"
+        return [result]
+
+    expanded = []
+    for unit in sub_units:
+        copy = deepcopy(result)
+        copy["listing"].update(unit)
+        # studios do not have a 'numBedrooms' so set it separately
+        if copy["listing"].get("propertyType") == "Studio":
+            copy["listing"]["numBedrooms"] = "1 bed"
+        expanded.append(copy)
+    return expanded
+
+
+def page_listings(data: dict) -> list[Listing]:
+    """Listings in one page of search results, one per unit of a development."""
+    return [Listing(r) for result in data["listings"] for r in _expand(result)]
+
+
+def iter_pages(
+    payload: dict,
+    endpoint: str = ENDPOINT,
+    cache: ResponseCache | None = None,
+    post: PostJson = post_json,
+) -> Iterator[tuple[list[Listing], bool]]:
+    """
+    Fetch search results lazily, one request per page.
+
+    Yields each page's listings and whether the page is unchanged since
+    it was last cached. Requests go through post (see replay.py).
+    """
+    payload = deepcopy(payload)
+    start = 0
+    while True:
+        payload["paging"]["from"] = str(start)
+        with metrics.span("search_page"):
+            data, unchanged = post(_session(), endpoint, HEADERS, payload, cache)
+        yield page_listings(data), unchanged
+
+        start += PAGE_SIZE
+        if start >= data["paging"]["totalResults"]:
+            return
+
+
+def _publish_date(listing: Listing) -> int:
+    return listing.as_dict().get("publishDate") or 0
+
+
+def full_search(
+    payload: dict,
+    endpoint: str = ENDPOINT,
+    cache: ResponseCache | None = None,
+) -> list[Listing]:
+    """Fetch every page of results."""
+    return [
+        listing
+        for page, _ in iter_pages(payload, endpoint, cache)
+        for listing in page
+    ]
+
+
+def incremental_pages(
+    payload: dict,
+    is_seen: Callable[[Listing], bool],
+    stop_after: int,
+    newer_than: int = 0,
+    endpoint: str = ENDPOINT,
+    cache: ResponseCache | None = None,
+    post: PostJson = post_json,
+    retry_ids: set[int] | None = None,
+    max_retry_pages: int = RETRY_MAX_PAGES,
+) -> Iterator[list[Listing]]:
+    """
+    Search newest first, yielding each page as it arrives.
+
+    Stops after a first page that is unchanged since the last search,
+    after stop_after cached listings in a row, or after a page whose
+    listings are all no newer than newer_than (a publish date in ms).
+    While listings in retry_ids (cached ones due for another attempt)
+    haven't been fetched, up to max_retry_pages more pages are: they are
+    usually older than the high-water mark, so stopping early would skip
+    them for good.
+    """
+    payload = {**payload, "sort": PUBLISH_DATE_DESC}
+    outstanding = set(retry_ids or ())
+
+    streak = pages = total = extra = 0
+    for page, unchanged in iter_pages(payload, endpoint, cache, post):
+        pages += 1
+        total += len(page)
+        outstanding.difference_update(listing_id(l.daft_link) for l in page)
+        if unchanged and pages == 1 and not outstanding:
+            log.info("Search results unchanged since last poll")
+            yield page
+            break
+
+        # Decide before yielding: the caller may mark the page as seen
+        for listing in page:
+            streak = streak + 1 if is_seen(listing) else 0
+            if streak >= stop_after:
+                done = True
+                break
+        else:
+            done = bool(page) and not any(_publish_date(l) > newer_than for l in page)
+
+        yield page
+        if done and outstanding:
+            if extra < max_retry_pages:
+                log.debug("Paging on for %s listing(s) due a retry", len(outstanding))
+                extra += 1
+                done = False
+            else:
+                log.info("%s listing(s) due a retry not found", len(outstanding))
+        if done:
+            break
+
+    log.info("Incremental search fetched %s page(s), %s listing(s)", pages, total)
+
+
+def incremental_search(
+    payload: dict,
+    is_seen: Callable[[Listing], bool],
+    stop_after: int,
+    newer_than: int = 0,
+    endpoint: str = ENDPOINT,
+    cache: ResponseCache | None = None,
+) -> list[Listing]:
+    """Collect incremental_pages into one list."""
+    return [
+        listing
+        for page in incremental_pages(
+            payload, is_seen, stop_after, newer_than, endpoint, cache
+        )
+        for listing in page
+    ]
+
+
+def query_for(search: DaftSearchConfig) -> SearchQuery:
+    """Build the query for a single profile."""
+    return SearchQuery(
+        locations=search.locations,
+        distance=search.distance,
+        max_price=search.max_price,
+        min_beds=search.min_beds,
+        max_beds=search.max_beds,
+        min_baths=search.min_baths,
+    )
+
+
+def merge_queries(searches: list[DaftSearchConfig]) -> dict[SearchQuery, list[int]]:
+    """
+    Group profiles by location/price band into one query each.
+
+    Returns each merged query with the indexes of the profiles it serves.
+    The merged bed/bath range covers every profile in the band.
+    """
+    bands: dict[tuple, list[int]] = {}
+    for index, search in enumerate(searches):
+        band = (search.locations, search.distance, search.max_price)
+        bands.setdefault(band, []).append(index)
+
+    merged = {}
+    for (locations, distance, max_price), indexes in bands.items():
+        query = SearchQuery(
+            locations=locations,
+            distance=distance,
+            max_price=max_price,
+            min_beds=min(searches[i].min_beds for i in indexes),
+            max_beds=max(searches[i].max_beds for i in indexes),
+            min_baths=min(searches[i].min_baths for i in indexes),
+        )
+        merged[query] = indexes
+    return merged
+
+
+def matches(listing: Listing, search: DaftSearchConfig) -> bool:
+    """
+    Check a listing against a profile's filters.
+
+    Fields Daft leaves out or can't be parsed (e.g. "Price on Application")
+    don't exclude a listing, mirroring the server-side search.
+    """
+    try:
+        beds = first_number(listing.bedrooms)
+    except KeyError:
+        beds = None
+    if beds is not None and not search.min_beds <= beds <= search.max_beds:
+        return False
+
+    baths = first_number(listing.bathrooms)
+    if baths is not None and baths < search.min_baths:
+        return False
+
+    price = monthly_price(listing.as_dict())
+    if price is not None and price > search.max_price:
+        return False
+
+    return True
+
+
+def stream_profiles(
+    searches: list[DaftSearchConfig],
+    caches: list[ListingCache] | None = None,
+    max_workers: int = 4,
+    post: PostJson = post_json,
+) -> Iterator[tuple[int, list[Listing]]]:
+    """
+    Run the searches for several profiles concurrently, page by page.
+
+    Duplicate queries are sent once. As each result page arrives it is
+    fanned out to the profiles whose filters match it, yielding (profile
+    index, listings) pairs. Incremental search needs the profiles' caches
+    to know when to stop; high-water marks are saved once the stream has
+    been consumed. Pass a Recording's or Replay's post to capture or
+    replay the search requests.
+    """
+    merged = merge_queries(searches)
+    log.info("Running %s search(es) for %s profile(s)", len(merged), len(searches))
+
+    incremental = [caches is not None and s.stop_after_seen > 0 for s in searches]
+    marks = [
+        load_high_water_mark(search.cache_file) if wanted else None
+        for search, wanted in zip(searches, incremental)
+    ]
+
+    due = [
+        caches[i].due_for_retry(RETRY_MAX_AGE) if wanted else set()
+        for i, wanted in enumerate(incremental)
+    ]
+    found: list[set[int]] = [set() for _ in searches]
+
+    # Compiled once here so bad rules fail before any request is sent
+    local_filters = [compile_filters(search.filters) for search in searches]
+
+    def wants(listing: Listing, index: int, query: SearchQuery) -> bool:
+        search = searches[index]
+        # The server already applied exactly this profile's beds/baths/price
+        if query != query_for(search) and not matches(listing, search):
+            return False
+        return local_filters[index](listing)
+
+    response_caches: dict[str, ResponseCache] = {}
+    for search in searches:
+        directory = search.response_cache_dir
+        if directory and directory not in response_caches:
+            response_caches[directory] = ResponseCache(
+                directory,
+                ttl=search.response_cache_ttl,
+                max_entries=search.response_cache_size,
+            )
+
+    def run(query: SearchQuery) -> Iterator[list[Listing]]:
+        payload = create_daft_search(query)
+        indexes = merged[query]
+        # Transport settings come from the first profile sharing the query
+        first = searches[indexes[0]]
+        endpoint = first.endpoint
+        cache = response_caches.get(first.response_cache_dir)
+        if not all(incremental[i] for i in indexes):
+            return (page for page, _ in iter_pages(payload, endpoint, cache, post))
+
+        def is_seen(listing: Listing) -> bool:
+            return all(
+                listing.daft_link in caches[i]
+                for i in indexes
+                if wants(listing, i, query)
+            )
+
+        return incremental_pages(
+            payload,
+            is_seen,
+            stop_after=min(searches[i].stop_after_seen for i in indexes),
+            newer_than=min(marks[i].publish_date for i in indexes),
+            endpoint=endpoint,
+            cache=cache,
+            post=post,
+            retry_ids=set().union(
+                *(marks[i].retries(due[i], RETRY_MAX_MISSED) for i in indexes)
+            ),
+        )
+
+    pages: Queue[tuple[SearchQuery, list[Listing] | None]] = Queue()
+
+    def produce(query: SearchQuery) -> None:
+        try:
+            for page in run(query):
+                pages.put((query, page))
+        finally:
+            pages.put((query, None))
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(merged)))) as pool:
+        futures = [pool.submit(produce, query) for query in merged]
+        running = len(futures)
+        while running:
+            query, page = pages.get()
+            if page is None:
+                running -= 1
+                continue
+            for index in merged[query]:
+                if due[index]:
+                    ids = {listing_id(l.daft_link) for l in page}
+                    found[index].update(due[index] & ids)
+                listings = [l for l in page if wants(l, index, query)]
+                if marks[index] is not None:
+                    for listing in listings:
+                        marks[index].advance(listing)
+                if listings:
+                    yield index, listings
+
+        # Surface search errors once the other searches have been handled
+        for future in futures:
+            future.result()
+
+    for index, (search, mark) in enumerate(zip(searches, marks)):
+        if mark is not None:
+            mark.record_retries(due[index], found[index])
+            save_high_water_mark(search.cache_file, mark)
+
+
+def search_profiles(
+    searches: list[DaftSearchConfig],
+    caches: list[ListingCache] | None = None,
+    max_workers: int = 4,
+) -> list[list[Listing]]:
+    """Collect stream_profiles into one listing list per profile."""
+    results: list[list[Listing]] = [[] for _ in searches]
+    for index, listings in stream_profiles(searches, caches, max_workers):
+        results[index].extend(listings)
+    return results
@@ -7,9 +7,13 @@ Usage:
 """
 
 import time
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
+from queue import Empty, Queue
 from typing import TYPE_CHECKING
+from urllib.parse import urlparse
 
 from selenium.webdriver import Chrome
 from selenium import webdriver
@@ -18,22 +22,29 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
 from selenium.common.exceptions import (
+    ElementClickInterceptedException,
     NoSuchElementException,
     TimeoutException,
     WebDriverException,
 )
 
-from webdriver_manager.chrome import ChromeDriverManager
-
 if TYPE_CHECKING:
     from daftlistings import Listing
 
+from . import metrics
+from .cache import ListingCache, Status
 from .email_notification import EmailNotifier
 from .config import AppConfig
-from .logger import get_logger
+from .driver import resolve_chromedriver
+from .logger import get_logger, log_context
+from .priority import ListingQueue
+from .ratelimit import RateLimiter
+from .session import load_session, save_session
 
 log = get_logger(__name__)
 
+# Seconds before listings skipped by a failed login are retried
+LOGIN_RETRY_DELAY = 15 * 60
 
 
 class DaftLoginError(Exception):
@@ -45,6 +56,34 @@ class DaftSubmissionError(Exception):
     """Raised when form submission fails."""
     pass
 
+
+def defer_unprocessed(
+    queue: Queue,
+    cache: ListingCache,
+    email_notifier: EmailNotifier,
+) -> None:
+    """Mark listings left over after a failed login to be retried later."""
+    if isinstance(queue, ListingQueue):
+        leftover = queue.remaining()
+    else:
+        leftover = []
+        while True:
+            try:
+                listing = queue.get_nowait()
+            except Empty:
+                break
+            if listing is not None:  # stop sentinel of a worker that had exited
+                leftover.append(listing)
+    if not leftover:
+        return
+
+    log.warning("%s listing(s) not processed, retrying later", len(leftover))
+    email_notifier.error_notify(leftover[0])
+    retry_after = time.time() + LOGIN_RETRY_DELAY
+    for listing in leftover:
+        cache.mark(listing.daft_link, Status.RETRY_AFTER, retry_after)
+
+
 class DaftBot:
     """
     Automated bot for applying to Daft.ie rental listings.
@@ -62,6 +101,29 @@ class DaftBot:
     """
 
     DEFAULT_TIMEOUT = 10  # seconds
+    HOME_URL = "https://www.daft.ie"
+
+    # Third-party requests blocked when browser.block_trackers is set
+    BLOCKED_URLS = [
+        "*google-analytics.com*",
+        "*googletagmanager.com*",
+        "*doubleclick.net*",
+        "*googlesyndication.com*",
+        "*facebook.net*",
+        "*hotjar.com*",
+        "*scorecardresearch.com*",
+        "*adservice.google.*",
+    ]
+
+    # Latency budget per step (seconds). Waits inside a step never run past it,
+    # and slower steps are logged so regressions show up.
+    STEP_BUDGETS = {
+        "login": 30,
+        "load_listing": 10,
+        "open_form": 8,
+        "fill_form": 8,
+        "submit": 12,
+    }
 
     # Centralized selectors - easy to update when Daft changes their UI
     SELECTORS = {
@@ -89,6 +151,9 @@ class DaftBot:
         config: AppConfig,
         email_notifier: EmailNotifier,
         headless: bool = True,
+        keep_alive: bool = False,
+        rate_limiter: RateLimiter | None = None,
+        worker_id: int = 0,
     ) -> None:
         """
         Initialize the DaftBot.
@@ -98,16 +163,27 @@ class DaftBot:
             email_notifier: Email notifier for error notifications.
             headless: If True, run browser without visible window (for servers).
                       If False, show browser window (for local testing).
+            keep_alive: If True, keep the browser logged in between calls to
+                        process_listings. Call close() when done.
+            rate_limiter: Spaces out listing page loads. Share one between
+                          bots running in parallel.
+            worker_id: Distinguishes bots of one profile running in
+                       parallel, which need their own Chrome profile.
         """
         self.config = config
         self.email_notifier = email_notifier
         self.headless = headless
+        self.keep_alive = keep_alive
+        self.rate_limiter = rate_limiter or RateLimiter(config.apply.listing_interval)
+        self.worker_id = worker_id
+        self.step_timings: dict[str, float] = {}
+        self._deadline: float | None = None
         self._driver: Chrome | None = None
 
     def process_listings(
         self,
         listings: list["Listing"],
-        cache: dict,
+        cache: ListingCache,
         use_cached_values: bool = True,
     ) -> None:
         """
@@ -115,32 +191,71 @@ class DaftBot:
 
         Args:
             listings: List of Daft listings to apply to.
-            cache: Cache dict to track applied listings.
+            cache: Listing cache to record applied/failed listings.
             use_cached_values: If True, use cached form values.
         """
         if not listings:
             log.info("No listings to process")
             return
 
-        log.info(f"Processing {len(listings)} listings")
+        log.info("Processing %s listings", len(listings))
 
-        try:
-            self._start_driver()
+        queue: Queue = Queue()
+        for listing in listings:
+            queue.put(listing)
+        queue.put(None)
+
+        self.process_queue(queue, cache, use_cached_values)
+        defer_unprocessed(queue, cache, self.email_notifier)
+
+        log.info("Finished processing all listings")
+
+    def start(self) -> None:
+        """
+        Start the browser and log in, unless a live session already exists.
+
+        A session saved by a previous run is restored first; the full login
+        only runs when there is none or it has expired.
+        """
+        if self._session_alive():
+            return
+        self._start_driver()
+        if not self._restore_session():
             self._login()
+            self._save_session()
 
-            for listing in listings:
-                self._process_single_listing(listing, cache, use_cached_values)
-                time.sleep(2)  # Delay between listings to avoid rate limiting
+    def process_queue(
+        self,
+        queue: Queue,
+        cache: ListingCache,
+        use_cached_values: bool = True,
+    ) -> None:
+        """
+        Log in, then apply to listings taken from the queue until a None.
+
+        Several bots can share the same queue, each stopping at its own
+        None, while listings are still being added. If login fails the
+        listings are left in the queue for other bots.
+        """
+        try:
+            self.start()
+
+            while (listing := queue.get()) is not None:
+                self.rate_limiter.wait(listing.daft_link)
+                with log_context(listing=listing.daft_link):
+                    self._process_single_listing(listing, cache, use_cached_values)
 
         except DaftLoginError as e:
-            log.error(f"Login failed: {e}")
-            if listings:
-                self.email_notifier.error_notify(listings[0])
+            log.error("Login failed: %s", e)
+            self._stop_driver()
 
         finally:
-            self._stop_driver()
+            if not self.keep_alive:
+                self._stop_driver()
 
-        log.info("Finished processing all listings")
+    def close(self) -> None:
+        """Close a kept-alive browser session."""
+        self._stop_driver()
 
     # =========================================================================
     # Driver Management
@@ -162,18 +277,49 @@ class DaftBot:
         options.add_experimental_option("excludeSwitches", ["enable-automation"])
         options.add_experimental_option("useAutomationExtension", False)
 
+        browser = self.config.browser
+        if browser.block_images:
+            options.add_argument("--blink-settings=imagesEnabled=false")
+            options.add_experimental_option(
+                "prefs", {"profile.managed_default_content_settings.images": 2}
+            )
+        if browser.profile_dir:
+            # Reuse a warmed profile (disk cache, service workers) across runs;
+            # worker IDs restart at 0 in every profile's pool
+            worker_dir = f"{self.config.profile}-worker-{self.worker_id}"
+            profile_dir = Path(browser.profile_dir).resolve() / worker_dir
+            options.add_argument(f"--user-data-dir={profile_dir}")
+
         if self.headless:
             options.add_argument("--headless=new")
             options.add_argument("--disable-gpu")
-            options.add_argument("--remote-debugging-port=9222")
             log.info("Starting Chrome in headless mode")
         else:
             options.add_argument("--start-maximized")
             log.info("Starting Chrome in visible mode (for local testing)")
 
-        service = Service(ChromeDriverManager().install())
+        # Return from get() at DOMContentLoaded; the flow waits explicitly for
+        # the elements it needs instead of for every image and tracker
+        options.page_load_strategy = "eager"
+
+        start = time.monotonic()
+        service = Service(
+            resolve_chromedriver(browser.chromedriver_path, browser.driver_cache_file)
+        )
         self._driver = webdriver.Chrome(service=service, options=options)
-        self._driver.implicitly_wait(5)
+
+        if browser.block_trackers:
+            try:
+                self._driver.execute_cdp_cmd("Network.enable", {})
+                self._driver.execute_cdp_cmd(
+                    "Network.setBlockedURLs", {"urls": self.BLOCKED_URLS}
+                )
+            except WebDriverException as e:
+                log.debug("Could not block trackers: %s", e)
+
+        elapsed = time.monotonic() - start
+        metrics.record("driver_start", elapsed, worker=self.worker_id)
+        log.info("Chrome started in %.2fs", elapsed)
 
     def _stop_driver(self) -> None:
         """Stop and clean up the WebDriver."""
@@ -182,10 +328,22 @@ class DaftBot:
                 self._driver.quit()
                 log.debug("Browser closed")
             except Exception as e:
-                log.warning(f"Error closing driver: {e}")
+                log.warning("Error closing driver: %s", e)
             finally:
                 self._driver = None
 
+    def _session_alive(self) -> bool:
+        """Check whether a logged-in browser from a previous call is usable."""
+        if self._driver is None:
+            return False
+        try:
+            self._driver.current_url
+            return True
+        except WebDriverException as e:
+            log.warning("Browser session lost, restarting: %s", e)
+            self._stop_driver()
+            return False
+
     @property
     def driver(self) -> Chrome:
         """Get the current driver, raising if not started."""
@@ -202,71 +360,150 @@ class DaftBot:
         Login to Daft.ie account.
         Raises DaftLoginError if login fails.
         """
-        log.info("Navigating to Daft.ie for login")
-        self.driver.get("https://daft.ie")
+        with self._step("login"):
+            log.info("Navigating to Daft.ie for login")
+            self.driver.get(self.HOME_URL)
 
-        # Accept cookies (may not always appear)
-        if self._safe_click(self.SELECTORS["cookie_accept"], timeout=5):
-            log.debug("Accepted cookies")
+            # Accept cookies (may not always appear)
+            if self._safe_click(self.SELECTORS["cookie_accept"], timeout=5):
+                log.debug("Accepted cookies")
 
-        self._dismiss_popups()
+            self._dismiss_popups()
 
-        # Navigate to sign in page
-        if not self._safe_click(self.SELECTORS["sign_in_link"]):
-            raise DaftLoginError("Could not find sign-in link")
+            # Navigate to sign in page
+            if not self._safe_click(self.SELECTORS["sign_in_link"]):
+                raise DaftLoginError("Could not find sign-in link")
 
-        log.debug("Clicked sign-in button")
-        time.sleep(1)
+            log.debug("Clicked sign-in button")
 
-        # Fill credentials
-        try:
-            account = self.config.daft_account
-
-            username_field = self._wait_for_element(self.SELECTORS["username"])
-            username_field.clear()
-            username_field.send_keys(account.email)
+            # Fill credentials
+            try:
+                account = self.config.daft_account
+
+                username_field = self._wait_for_element(self.SELECTORS["username"])
+                login_url = self.driver.current_url  # Keycloak's sign-in form
+                username_field.clear()
+                username_field.send_keys(account.email)
+
+                password_field = self._wait_for_element(self.SELECTORS["password"])
+                password_field.send_keys(account.password)
+
+                log.info("Entering credentials")
+
+                if not self._safe_click(self.SELECTORS["login_submit"]):
+                    raise DaftLoginError("Could not click login button")
+
+                log.info("Login submitted, waiting for redirect...")
+                try:
+                    # Keycloak's own URLs (".../openid-connect/auth") don't say
+                    # "login", so wait to be back on daft.ie and signed in
+                    # before the cookies are saved
+                    WebDriverWait(self.driver, self._timeout()).until(
+                        EC.url_changes(login_url)
+                    )
+                    WebDriverWait(self.driver, self._timeout()).until(
+                        lambda driver: self._is_signed_in()
+                    )
+                except TimeoutException:
+                    self._take_screenshot("login_failed")
+                    raise DaftLoginError(
+                        "Login appears to have failed - not signed in on daft.ie"
+                    )
+
+                log.info("Login successful")
 
-            password_field = self._wait_for_element(self.SELECTORS["password"])
-            password_field.send_keys(account.password)
+            except TimeoutException as e:
+                self._take_screenshot("login_timeout")
+                raise DaftLoginError(f"Timeout during login: {e}")
+
+    def _restore_session(self) -> bool:
+        """Load saved cookies/localStorage and check they are still logged in."""
+        session_file = self.config.daft_account.session_file
+        session = load_session(session_file) if session_file else None
+        if session is None:
+            return False
 
-            log.info("Entering credentials")
+        with self._step("login"):
+            # Cookies can only be set for the domain currently loaded
+            self.driver.get(self.HOME_URL)
+            for cookie in session["cookies"]:
+                try:
+                    self.driver.add_cookie(cookie)
+                except WebDriverException as e:
+                    log.debug("Skipping saved cookie %s: %s", cookie.get("name"), e)
+            self.driver.execute_script(
+                "for (const [k, v] of Object.entries(arguments[0])) "
+                "localStorage.setItem(k, v);",
+                session["local_storage"],
+            )
+            self.driver.refresh()
+            try:
+                # readyState comes before the nav renders (eager page loads),
+                # and with no nav links _is_signed_out() would say signed in
+                self._wait_for_element(self.SELECTORS["sign_in_link"])
+            except TimeoutException:
+                log.info("Could not check the saved session, logging in again")
+                return False
 
-            if not self._safe_click(self.SELECTORS["login_submit"]):
-                raise DaftLoginError("Could not click login button")
+            if not self._is_signed_in():
+                log.info("Saved session expired, logging in again")
+                return False
 
-            log.info("Login submitted, waiting for redirect...")
-            time.sleep(3)
+        log.info("Restored saved session")
+        return True
 
-            if "login" in self.driver.current_url.lower():
-                self._take_screenshot("login_failed")
-                raise DaftLoginError("Login appears to have failed - still on login page")
+    def _is_signed_out(self) -> bool:
+        """Cheap probe: the nav shows 'Sign in' only to signed-out visitors."""
+        for link in self.driver.find_elements(
+            By.CSS_SELECTOR, self.SELECTORS["sign_in_link"]
+        ):
+            if "sign in" in link.text.lower():
+                return True
+        return False
 
-            log.info("Login successful")
+    def _is_signed_in(self) -> bool:
+        """On daft.ie with the nav's account menu showing instead of 'Sign in'."""
+        host = urlparse(self.driver.current_url).hostname
+        if host != urlparse(self.HOME_URL).hostname:
+            return False
+        links = self.driver.find_elements(
+            By.CSS_SELECTOR, self.SELECTORS["sign_in_link"]
+        )
+        return bool(links) and not self._is_signed_out()
 
-        except TimeoutException as e:
-            self._take_screenshot("login_timeout")
-            raise DaftLoginError(f"Timeout during login: {e}")
+    def _save_session(self) -> None:
+        """Save cookies/localStorage after a successful login."""
+        session_file = self.config.daft_account.session_file
+        if not session_file:
+            return
+        local_storage = self.driver.execute_script(
+            "return Object.fromEntries(Object.entries(localStorage));"
+        )
+        save_session(session_file, self.driver.get_cookies(), local_storage or {})
 
     def _process_single_listing(
         self,
         listing: "Listing",
-        cache: dict,
+        cache: ListingCache,
         use_cached_values: bool,
     ) -> None:
         """Process a single listing with error handling."""
         try:
-            success = self._apply_to_listing(listing, use_cached_values)
+            with metrics.span("apply", worker=self.worker_id):
+                success = self._apply_to_listing(listing, use_cached_values)
 
-            if not success:
+            if success:
+                cache.mark(listing.daft_link, Status.APPLIED)
+            else:
                 self._handle_failure(listing, cache)
 
         except WebDriverException as e:
-            log.error(f"WebDriver error for {listing.daft_link}: {e}")
+            log.error("WebDriver error for %s: %s", listing.daft_link, e)
             self._handle_failure(listing, cache)
             self._take_screenshot("webdriver_error")
 
         except Exception as e:
-            log.error(f"Unexpected error for {listing.daft_link}: {e}")
+            log.error("Unexpected error for %s: %s", listing.daft_link, e)
             self._handle_failure(listing, cache)
 
     def _apply_to_listing(self, listing: "Listing", use_cached_values: bool) -> bool:
@@ -274,128 +511,194 @@ class DaftBot:
         Apply to a single listing. Returns True if successful.
         """
         account = self.config.daft_account
-        log.info(f"Processing listing: {listing.daft_link}")
-
-        self.driver.get(listing.daft_link)
-        time.sleep(2)
-        self._dismiss_popups()
-
-        # Click email agent button (try primary, then fallback)
-        if not self._safe_click(self.SELECTORS["email_agent"], timeout=5):
-            if not self._safe_click(self.SELECTORS["email_fallback"], timeout=5):
+        log.info("Processing listing: %s", listing.daft_link)
+        self.step_timings = {}
+
+        with self._step("load_listing"):
+            self.driver.get(listing.daft_link)
+            self._wait_for_ready()
+            self._dismiss_popups()
+
+        with self._step("open_form"):
+            # Click email agent button (primary or fallback, whichever shows up)
+            if not self._click_first(
+                [self.SELECTORS["email_agent"], self.SELECTORS["email_fallback"]],
+                timeout=5,
+            ):
                 log.warning("Could not find email agent button")
                 self._take_screenshot("no_email_button")
                 return False
 
-        time.sleep(2)
-        self._dismiss_popups()
+            # Wait for the contact form or the already-applied panel
+            try:
+                WebDriverWait(self.driver, self._timeout()).until(
+                    EC.any_of(
+                        self._present("already_applied"),
+                        self._present("submit_button"),
+                    )
+                )
+            except TimeoutException:
+                log.warning("Contact form did not open")
+                self._take_screenshot("no_contact_form")
+                return False
 
-        # Check if already applied
-        try:
-            self.driver.find_element(By.CSS_SELECTOR, self.SELECTORS["already_applied"])
-            log.info("Already applied to this listing, skipping")
-            return True
-        except NoSuchElementException:
-            pass
+            # Check if already applied
+            if self.driver.find_elements(
+                By.CSS_SELECTOR, self.SELECTORS["already_applied"]
+            ):
+                log.info("Already applied to this listing, skipping")
+                return True
 
         # Fill form if not using cached values
         if not use_cached_values:
-            try:
-                self._fill_field("first_name", account.first_name)
-                self._fill_field("last_name", account.last_name)
-                self._fill_field("email", account.email)
-                self._fill_field("phone", account.phone_number)
-
-                self._safe_click(self.SELECTORS["tenants_increment"])
-
-                self._fill_field("message", account.message_text)
-                time.sleep(1)
-
-            except TimeoutException as e:
-                log.error(f"Timeout filling form: {e}")
-                self._take_screenshot("form_timeout")
+            with self._step("fill_form"):
+                try:
+                    self._fill_field("first_name", account.first_name)
+                    self._fill_field("last_name", account.last_name)
+                    self._fill_field("email", account.email)
+                    self._fill_field("phone", account.phone_number)
+
+                    self._safe_click(self.SELECTORS["tenants_increment"])
+
+                    self._fill_field("message", account.message_text)
+
+                except TimeoutException as e:
+                    log.error("Timeout filling form: %s", e)
+                    self._take_screenshot("form_timeout")
+                    return False
+
+        with self._step("submit"):
+            self._dismiss_popups()
+            if not self._safe_click(self.SELECTORS["submit_button"]):
+                log.error("Could not click submit button")
+                self._take_screenshot("submit_failed")
                 return False
 
-        # Submit
-        self._dismiss_popups()
-        if not self._safe_click(self.SELECTORS["submit_button"]):
-            log.error("Could not click submit button")
-            self._take_screenshot("submit_failed")
-            return False
-
-        time.sleep(3)
-
-        # Verify success
-        try:
-            success_element = self._wait_for_element(
-                self.SELECTORS["success_message"], timeout=10
-            )
-            success_text = success_element.text
-
-            if "enquiry has been sent" in success_text.lower():
-                log.info("Application submitted successfully")
-                return True
-            else:
-                log.warning(f"Unexpected response: {success_text}")
-                self._take_screenshot("unexpected_response")
+            # Verify success (the alert is in the form, hidden, before submit)
+            try:
+                success_element = self._wait_for_element(
+                    self.SELECTORS["success_message"], timeout=10, visible=True
+                )
+                success_text = success_element.text
+
+                if "enquiry has been sent" in success_text.lower():
+                    log.info("Application submitted successfully")
+                    return True
+                else:
+                    log.warning("Unexpected response: %s", success_text)
+                    self._take_screenshot("unexpected_response")
+                    return False
+
+            except TimeoutException:
+                log.warning("Could not verify submission success")
+                self._take_screenshot("no_success_message")
                 return False
 
-        except TimeoutException:
-            log.warning("Could not verify submission success")
-            self._take_screenshot("no_success_message")
-            return False
-
-    def _handle_failure(self, listing: "Listing", cache: dict) -> None:
-        """Handle a failed listing application."""
-        if listing.daft_link in cache:
-            cache.pop(listing.daft_link)
+    def _handle_failure(self, listing: "Listing", cache: ListingCache) -> None:
+        """Handle a failed listing application. Failed listings are retried next run."""
+        cache.mark(listing.daft_link, Status.FAILED)
         self.email_notifier.error_notify(listing)
 
     # =========================================================================
     # Helper Methods
     # =========================================================================
 
+    @contextmanager
+    def _step(self, name: str) -> Iterator[None]:
+        """
+        Time a step of the flow against its latency budget.
+
+        Waits inside the step share the budget: none of them waits past it.
+        """
+        budget = self.STEP_BUDGETS[name]
+        start = time.monotonic()
+        self._deadline = start + budget
+        try:
+            yield
+        finally:
+            self._deadline = None
+            elapsed = time.monotonic() - start
+            self.step_timings[name] = elapsed
+            metrics.record(name, elapsed, worker=self.worker_id)
+            if elapsed > budget:
+                log.warning("Step '%s' took %.2fs (budget %ss)", name, elapsed, budget)
+            else:
+                log.debug("Step '%s' took %.2fs", name, elapsed)
+
+    def _timeout(self, timeout: float | None = None) -> float:
+        """Wait timeout, capped by what is left of the current step's budget."""
+        timeout = timeout or self.DEFAULT_TIMEOUT
+        if self._deadline is not None:
+            timeout = min(timeout, max(0.0, self._deadline - time.monotonic()))
+        return timeout
+
+    def _present(self, name: str):
+        """Presence condition for a named selector."""
+        selector = self.SELECTORS[name]
+        return EC.presence_of_element_located((By.CSS_SELECTOR, selector))
+
+    def _wait_for_ready(self) -> None:
+        """Wait until the DOM is ready (page loads return early, see _start_driver)."""
+        WebDriverWait(self.driver, self._timeout()).until(
+            lambda driver: driver.execute_script("return document.readyState")
+            in ("interactive", "complete")
+        )
+
     def _wait_for_element(
         self,
         selector: str,
         by: str = By.CSS_SELECTOR,
-        timeout: int | None = None,
+        timeout: float | None = None,
         clickable: bool = False,
+        visible: bool = False,
     ):
-        """Wait for an element to be present/clickable and return it."""
-        timeout = timeout or self.DEFAULT_TIMEOUT
-        condition = (
-            EC.element_to_be_clickable((by, selector))
-            if clickable
-            else EC.presence_of_element_located((by, selector))
-        )
-        return WebDriverWait(self.driver, timeout).until(condition)
+        """Wait for an element to be present/visible/clickable and return it."""
+        if clickable:
+            condition = EC.element_to_be_clickable((by, selector))
+        elif visible:
+            condition = EC.visibility_of_element_located((by, selector))
+        else:
+            condition = EC.presence_of_element_located((by, selector))
+        return WebDriverWait(self.driver, self._timeout(timeout)).until(condition)
 
-    def _safe_click(self, selector: str, timeout: int | None = None) -> bool:
+    def _safe_click(self, selector: str, timeout: float | None = None) -> bool:
         """Safely click an element, returning True if successful."""
+        return self._click_first([selector], timeout)
+
+    def _click_first(self, selectors: list[str], timeout: float | None = None) -> bool:
+        """Click whichever of the selectors becomes clickable first."""
+        condition = EC.any_of(
+            *(EC.element_to_be_clickable((By.CSS_SELECTOR, s)) for s in selectors)
+        )
         try:
-            element = self._wait_for_element(selector, clickable=True, timeout=timeout)
-            element.click()
+            wait = WebDriverWait(self.driver, self._timeout(timeout))
+            element = wait.until(condition)
+            try:
+                element.click()
+            except ElementClickInterceptedException:
+                # A popup slid over the element after it became clickable
+                self._dismiss_popups()
+                element.click()
             return True
         except (TimeoutException, NoSuchElementException) as e:
-            log.debug(f"Could not click {selector}: {e}")
+            log.debug("Could not click %s: %s", selectors, e)
             return False
 
     def _dismiss_popups(self) -> None:
-        """Dismiss any feedback/survey popups that might appear."""
+        """Dismiss any feedback/survey popups that are currently shown."""
         popup_selectors = [
             self.SELECTORS["feedback_close"],
             '[aria-label="Close"]',
             '[data-testid="close-button"]',
         ]
         for selector in popup_selectors:
-            try:
-                element = self.driver.find_element(By.CSS_SELECTOR, selector)
-                element.click()
-                log.debug(f"Dismissed popup: {selector}")
-                time.sleep(0.5)
-            except NoSuchElementException:
-                pass
+            for element in self.driver.find_elements(By.CSS_SELECTOR, selector):
+                try:
+                    if element.is_displayed():
+                        element.click()
+                        log.debug("Dismissed popup: %s", selector)
+                except WebDriverException:
+                    pass  # Closed itself or not interactable
 
     def _fill_field(self, field_name: str, value: str) -> None:
         """Clear and fill a form field by name."""
@@ -403,18 +706,17 @@ class DaftBot:
         if not selector:
             raise ValueError(f"Unknown field: {field_name}")
 
-        log.debug(f"Filling field: {field_name}")
+        log.debug("Filling field: %s", field_name)
         try:
             element = self._wait_for_element(selector)
             self.driver.execute_script("arguments[0].value = '';", element)
-            time.sleep(0.3)
             element.send_keys(value)
-            log.debug(f"Filled field: {field_name}")
+            log.debug("Filled field: %s", field_name)
         except TimeoutException:
-            log.error(f"Timeout waiting for field: {field_name}")
+            log.error("Timeout waiting for field: %s", field_name)
             raise
         except Exception as e:
-            log.error(f"Error filling field '{field_name}': {e}")
+            log.error("Error filling field '%s': %s", field_name, e)
             raise
 
     def _take_screenshot(self, name: str) -> str:
@@ -425,5 +727,5 @@ class DaftBot:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = screenshots_dir / f"{name}_{timestamp}.png"
         self.driver.get_screenshot_as_file(str(filename))
-        log.info(f"Screenshot saved: {filename}")
+        log.info("Screenshot saved: %s", filename)
         return str(filename)
@@ -0,0 +1,67 @@
+"""
+Saved Daft.ie login session.
+
+After a successful login the browser's cookies and localStorage are
+written to a JSON file (readable only by the owner) so the next run can
+restore them instead of logging in again.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from time import time
+
+from .logger import get_logger
+
+log = get_logger(__name__)
+
+
+def save_session(path: str, cookies: list[dict], local_storage: dict[str, str]) -> None:
+    """Atomically write the session file with owner-only permissions."""
+    session_path = Path(path)
+    # Parallel workers may save at the same time, so the temp name is per thread
+    suffix = f"{os.getpid()}.{threading.get_ident()}.tmp"
+    tmp_path = session_path.with_name(f"{session_path.name}.{suffix}")
+    try:
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            session = {
+                "saved_at": int(time()),
+                "cookies": cookies,
+                "local_storage": local_storage,
+            }
+            json.dump(session, f)
+        os.replace(tmp_path, session_path)
+        log.debug("Session saved to %s", session_path)
+    except (IOError, OSError) as e:
+        log.warning("Unable to save session: %s", e)
+        tmp_path.unlink(missing_ok=True)
+
+
+def load_session(path: str) -> dict | None:
+    """
+    Load a saved session, dropping cookies that have already expired.
+
+    Returns None if there is no usable session.
+    """
+    try:
+        with open(path, "r") as f:
+            session = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        log.warning("Ignoring unreadable session file: %s", e)
+        return None
+
+    now = time()
+    cookies = [
+        cookie
+        for cookie in session.get("cookies", [])
+        if cookie.get("expiry") is None or cookie["expiry"] > now
+    ]
+    if not cookies:
+        return None
+    session["cookies"] = cookies
+    session.setdefault("local_storage", {})
+    return session
@@ -0,0 +1,222 @@
+"""
+Parallel application workers.
+
+Usage:
+    pool = ApplicationPool(config, email_notifier, headless=True)
+    pool.process_listings(listings, cache, use_cached_values=True)
+    pool.close()
+
+    # Or stream listings in as they are found
+    pool.begin(cache, use_cached_values=True)
+    pool.submit(listing)
+    pool.finish()
+
+Each worker is a DaftBot with its own logged-in Chrome. Workers take
+listings from one priority queue, best scored first (see priority.py),
+and share a per-host rate limiter with each other and with every other
+pool in the process, so listing pages are loaded no faster than with a
+single bot, however many profiles run. apply_max_per_run caps how many listings one run
+applies to; the rest are retried on the next run.
+
+In fast mode, with apply_enquiry_endpoint set, enquiries are first sent
+over HTTP with the saved login session; only listings where that fails
+are handed to the browsers, so Chrome is not started at all when every
+enquiry goes through.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from time import time
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from daftlistings import Listing
+
+from .cache import ListingCache, Status
+from .config import AppConfig
+from .email_notification import EmailNotifier
+from .http_submitter import HttpSubmitter
+from .logger import get_logger, log_context
+from .priority import ListingQueue, compile_score
+from .ratelimit import shared_rate_limiter
+from .selenium_bot import DaftBot, defer_unprocessed
+
+log = get_logger(__name__)
+
+
+class ApplicationPool:
+    """Pool of DaftBot sessions applying to listings in parallel."""
+
+    def __init__(
+        self,
+        config: AppConfig,
+        email_notifier: EmailNotifier,
+        headless: bool = True,
+        keep_alive: bool = False,
+    ) -> None:
+        """
+        Initialize the pool with config.apply.workers bots.
+
+        Args:
+            config: Application configuration.
+            email_notifier: Email notifier for error notifications.
+            headless: If True, run browsers without visible windows.
+            keep_alive: If True, keep every browser logged in between calls
+                        to process_listings. Call close() when done.
+        """
+        self.config = config
+        self.email_notifier = email_notifier
+        self.score = compile_score(config.apply, config.daft_search.max_price)
+        self._lock = threading.Lock()
+        # Shared with every other profile's pool in this process
+        rate_limiter = shared_rate_limiter(config.apply.listing_interval)
+        self.submitter = HttpSubmitter(config, rate_limiter)
+        self.bots = [
+            DaftBot(
+                config=config,
+                email_notifier=email_notifier,
+                headless=headless,
+                keep_alive=keep_alive,
+                rate_limiter=rate_limiter,
+                worker_id=index,
+            )
+            for index in range(max(1, config.apply.workers))
+        ]
+
+    def start(self) -> None:
+        """Pre-warm every bot: start the browsers and log in concurrently."""
+        with ThreadPoolExecutor(max_workers=len(self.bots)) as pool:
+            for future in [pool.submit(bot.start) for bot in self.bots]:
+                try:
+                    future.result()
+                except Exception as e:
+                    log.error("Could not pre-warm browser: %s", e)
+
+    def process_listings(
+        self,
+        listings: list["Listing"],
+        cache: ListingCache,
+        use_cached_values: bool = True,
+    ) -> None:
+        """Apply to all listings using as many bots as there are listings."""
+        if not listings:
+            log.info("No listings to process")
+            return
+
+        self.begin(cache, use_cached_values)
+        for listing in listings:
+            self.submit(listing)
+        self.finish()
+
+    def begin(self, cache: ListingCache, use_cached_values: bool = True) -> None:
+        """
+        Start accepting listings with submit() until finish() is called.
+
+        With use_cached_values and a saved session, listings are first sent
+        over HTTP and only the ones that fail go to the browsers. Browsers
+        start on demand, one more for each listing waiting for one.
+        """
+        self._cache = cache
+        self._use_cached_values = use_cached_values
+        self._submitted = 0
+        self._browser_listings = 0
+        self._browser_threads: list[threading.Thread] = []
+
+        # The first stage applies the per-run cap; HTTP failures passed on
+        # to the browsers have already been counted
+        limit = self.config.apply.max_per_run
+        self._http_queue: ListingQueue | None = None
+        self._http_thread: threading.Thread | None = None
+        http_enabled = bool(self.config.apply.enquiry_endpoint) and use_cached_values
+        if http_enabled and self.submitter.load_session():
+            self._http_queue = ListingQueue(self.score, limit)
+            self._browser_queue = ListingQueue(self.score)
+            self._http_thread = threading.Thread(
+                target=self._submit_over_http, name="http-submitter", daemon=True
+            )
+            self._http_thread.start()
+        else:
+            if http_enabled:
+                log.debug("No saved session, applying through the browser")
+            self._browser_queue = ListingQueue(self.score, limit)
+
+    def submit(self, listing: "Listing") -> None:
+        """Queue one listing to apply to. Returns immediately."""
+        self._submitted += 1
+        if self._http_queue is not None:
+            self._http_queue.put(listing)
+        else:
+            self._to_browser(listing)
+
+    def finish(self) -> None:
+        """Wait until every submitted listing has been applied to."""
+        if self._http_thread is not None:
+            self._http_queue.put(None)
+            self._http_thread.join()
+
+        with self._lock:
+            threads = list(self._browser_threads)
+        for _ in threads:
+            self._browser_queue.put(None)
+        for thread in threads:
+            thread.join()
+
+        first = self._http_queue if self._http_queue is not None else self._browser_queue
+        if first.limit and first.handed_out >= first.limit:
+            capped = first.remaining()
+            if capped:
+                log.info("Apply cap reached, retrying %s next run", len(capped))
+            for listing in capped:
+                self._cache.mark(listing.daft_link, Status.RETRY_AFTER, time())
+
+        defer_unprocessed(self._browser_queue, self._cache, self.email_notifier)
+        log.info("Finished processing %s listing(s)", self._submitted)
+
+    def _to_browser(self, listing: "Listing") -> None:
+        """Queue a listing for the browsers, starting a spare bot if needed."""
+        with self._lock:
+            self._browser_queue.put(listing)
+            self._browser_listings += 1
+            started = len(self._browser_threads)
+            if started >= min(len(self.bots), self._browser_listings):
+                return
+            bot = self.bots[started]
+            thread = threading.Thread(
+                target=self._run_bot, args=(bot,), name=f"apply-{started}", daemon=True
+            )
+            self._browser_threads.append(thread)
+        log.info("Starting browser worker %s", bot.worker_id)
+        thread.start()
+
+    def _run_bot(self, bot: DaftBot) -> None:
+        """Browser worker: apply to queued listings until finish()."""
+        with log_context(profile=self.config.profile):
+            try:
+                bot.process_queue(
+                    self._browser_queue, self._cache, self._use_cached_values
+                )
+            except Exception as e:
+                log.error("Browser worker %s stopped: %s", bot.worker_id, e)
+
+    def _submit_over_http(self) -> None:
+        """HTTP worker: send enquiries without a browser, passing failures on."""
+        with log_context(profile=self.config.profile):
+            while (listing := self._http_queue.get()) is not None:
+                with log_context(listing=listing.daft_link):
+                    self._submit_one(listing)
+
+    def _submit_one(self, listing: "Listing") -> None:
+        try:
+            if self.submitter.signed_in and self.submitter.submit(listing):
+                self._cache.mark(listing.daft_link, Status.APPLIED)
+                return
+        except Exception as e:
+            log.error("HTTP enquiry error for %s: %s", listing.daft_link, e)
+        log.info("Falling back to the browser for %s", listing.daft_link)
+        self._to_browser(listing)
+
+    def close(self) -> None:
+        """Close every kept-alive browser session."""
+        self.submitter.close()
+        for bot in self.bots:
+            bot.close()